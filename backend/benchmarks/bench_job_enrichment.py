@@ -0,0 +1,95 @@
+"""
+Benchmark: three-call job enrichment (summary + skills + knowledge prompts)
+versus the single structured JSON call.
+
+Uses real job descriptions from data/*.csv and live OpenAI calls with the
+LLM response cache disabled. Run from the backend/ folder:
+    python -m benchmarks.bench_job_enrichment --jobs 5
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.embedding_service as embedding_service  # noqa: E402
+from core.llm_gateway import llm_gateway  # noqa: E402
+from core.llm_cache import llm_cache_disabled  # noqa: E402
+
+
+class UsageRecorder:
+    """Wraps chat.completions.create to total up token usage per path"""
+
+    def __init__(self, create):
+        self._create = create
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def __call__(self, **kwargs):
+        resp = self._create(**kwargs)
+        self.calls += 1
+        if resp.usage:
+            self.prompt_tokens += resp.usage.prompt_tokens
+            self.completion_tokens += resp.usage.completion_tokens
+        return resp
+
+    def reset(self):
+        self.calls = self.prompt_tokens = self.completion_tokens = 0
+
+
+def load_job_descriptions(limit: int):
+    frames = [pd.read_csv(path) for path in glob.glob("data/*.csv")]
+    df = pd.concat(frames, ignore_index=True)
+    descriptions = df["Full Job Description"].dropna().astype(str)
+    return descriptions.head(limit).tolist()
+
+
+def three_call_path(description: str):
+    summary = embedding_service.summarize_job_description(description)
+    extraction = embedding_service.extract_job_skills_knowledge(description)
+    return summary, extraction
+
+
+def combined_path(description: str):
+    return embedding_service.enrich_job_description(description)
+
+
+def run_path(name, fn, descriptions, recorder):
+    recorder.reset()
+    latencies = []
+    for description in descriptions:
+        start = time.perf_counter()
+        fn(description)
+        latencies.append(time.perf_counter() - start)
+
+    n = len(descriptions)
+    print(f"\n{name}")
+    print(f"  calls/job:             {recorder.calls / n:.1f}")
+    print(f"  prompt tokens/job:     {recorder.prompt_tokens / n:.0f}")
+    print(f"  completion tokens/job: {recorder.completion_tokens / n:.0f}")
+    print(f"  latency mean:          {statistics.mean(latencies):.2f}s")
+    print(f"  latency p50:           {statistics.median(latencies):.2f}s")
+    print(f"  latency max:           {max(latencies):.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5)
+    args = parser.parse_args()
+
+    descriptions = load_job_descriptions(args.jobs)
+    openai_client = llm_gateway.openai_client
+    recorder = UsageRecorder(openai_client.chat.completions.create)
+    openai_client.chat.completions.create = recorder
+
+    print(f"Benchmarking job enrichment on {len(descriptions)} jobs")
+    with llm_cache_disabled():
+        run_path("Three-call path", three_call_path, descriptions, recorder)
+        run_path("Single structured call", combined_path, descriptions, recorder)
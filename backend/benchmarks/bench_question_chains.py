@@ -0,0 +1,76 @@
+"""
+Microbenchmark: independent question-chain calls run one by one with .invoke
+versus together with .batch at increasing max_concurrency.
+
+Sends one coding-MCQ prompt per language (what the coding branch of
+generate_questions batches) with the LLM response cache disabled. Run from
+the backend/ folder against the fake server (benchmarks/fake_llm_server.py,
+OPENAI_BASE_URL=http://localhost:8900/v1) or OpenAI:
+    python -m benchmarks.bench_question_chains --prompts 8 --runs 3
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.questions_generation_service as questions_service  # noqa: E402
+from core.llm_cache import llm_cache_disabled  # noqa: E402
+
+TOPICS = "Python, Java, SQL, REST APIs, testing, data structures"
+LANGUAGES = ["Python", "Java", "JavaScript", "C++", "Go", "SQL", "Rust", "C#"]
+CONCURRENCY_LEVELS = [1, 2, 4, 8]
+
+
+def chain_inputs(prompts: int):
+    return [
+        {"topics": TOPICS, "lang": LANGUAGES[i % len(LANGUAGES)], "count": 2}
+        for i in range(prompts)
+    ]
+
+
+def sequential(inputs):
+    return [questions_service.coding_mcqs_direct_chain.invoke(x) for x in inputs]
+
+
+def batched(inputs, max_concurrency: int):
+    return questions_service.coding_mcqs_direct_chain.batch(
+        inputs, config={"max_concurrency": max_concurrency}
+    )
+
+
+def report(label: str, fn, runs: int):
+    latencies, parsed = [], 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        results = fn()
+        latencies.append(time.perf_counter() - start)
+        parsed += sum(isinstance(result, list) for result in results)
+    print(
+        f"  {label:<22} mean {statistics.mean(latencies):6.2f}s"
+        f"   p50 {statistics.median(latencies):6.2f}s"
+        f"   parsed {parsed}/{runs * len(results)}"
+    )
+    return statistics.mean(latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prompts", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    inputs = chain_inputs(args.prompts)
+    print(f"Benchmarking {args.prompts} coding-MCQ prompts over {args.runs} runs")
+    with llm_cache_disabled():
+        baseline = report("sequential invoke", lambda: sequential(inputs), args.runs)
+        for level in CONCURRENCY_LEVELS:
+            mean = report(
+                f"batch concurrency={level}",
+                lambda: batched(inputs, level),
+                args.runs,
+            )
+            print(f"  {'':<22} speedup x{baseline / mean:.2f}")
@@ -0,0 +1,83 @@
+"""
+Benchmark: two-stage question generation (free-form questions, then MCQ
+conversion) versus single-stage generation of complete MCQs.
+
+Runs generate_questions in both QUESTION_GENERATION_MODEs with the LLM
+response cache and the question bank disabled, so every slot is generated
+and nothing is written to the bank, and reports calls, tokens and latency
+per run from the LLM metrics. Run from the backend/ folder, against OpenAI or the fake
+server (benchmarks/fake_llm_server.py):
+    python -m benchmarks.bench_question_generation --runs 3
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.questions_generation_service as questions_service  # noqa: E402
+from core.llm_cache import llm_cache_disabled  # noqa: E402
+from core.llm_metrics import llm_metrics, pipeline_run  # noqa: E402
+from services.question_bank import question_bank  # noqa: E402
+
+PROFILES = [
+    (
+        "Comfortable with Python and SQL, weaker at algorithms and testing.",
+        "Thesis on REST API performance with Django and PostgreSQL.",
+        "Backend developer working on cloud services.",
+    ),
+    (
+        "Built several React apps in JavaScript; little experience with Java.",
+        "Usability study of single-page applications.",
+        "Full-stack web developer.",
+    ),
+    (
+        "Strong in statistics and Python, some C++ from coursework.",
+        "Machine learning models for network intrusion detection.",
+        "Data scientist or ML engineer.",
+    ),
+]
+
+
+def run_mode(mode: str, runs: int):
+    questions_service.QUESTION_GENERATION_MODE = mode
+    latencies, summaries, counts = [], [], []
+    for i in range(runs):
+        profile = PROFILES[i % len(PROFILES)]
+        run_id = f"bench-{mode}-{i}"
+        start = time.perf_counter()
+        with pipeline_run(run_id):
+            result = questions_service.generate_questions(*profile)
+        latencies.append(time.perf_counter() - start)
+        summaries.append(llm_metrics.run_summary(run_id) or {})
+        counts.append(len(result["questions"]))
+
+    def per_run(field):
+        return sum(s.get(field, 0) for s in summaries) / runs
+
+    print(f"\n{mode}")
+    print(f"  questions/run:         {sum(counts) / runs:.1f}")
+    print(f"  LLM calls/run:         {per_run('calls'):.1f}")
+    print(f"  prompt tokens/run:     {per_run('prompt_tokens'):.0f}")
+    print(f"  completion tokens/run: {per_run('completion_tokens'):.0f}")
+    print(f"  cost/run:              ${per_run('cost_usd'):.4f}")
+    print(f"  latency mean:          {statistics.mean(latencies):.2f}s")
+    print(f"  latency p50:           {statistics.median(latencies):.2f}s")
+    print(f"  latency max:           {max(latencies):.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Benchmarking question generation over {args.runs} runs per mode")
+    # banked questions would skip generation (and earlier runs would seed the
+    # bank for later ones); benchmark MCQs mustn't reach the real bank either
+    question_bank.enabled = False
+    with llm_cache_disabled():
+        run_mode("two_stage", args.runs)
+        run_mode("single", args.runs)
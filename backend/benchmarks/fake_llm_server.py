@@ -0,0 +1,495 @@
+"""
+Local stand-in for the OpenAI chat-completions and Anthropic messages APIs.
+
+Returns deterministic, schema-valid responses for each of our prompts
+(job enrichment, profile, question generation, MCQ validation, roadmaps),
+with configurable latency and error injection, so the pipeline can be
+benchmarked and load-tested offline. Run from the backend/ folder:
+
+    python -m benchmarks.fake_llm_server --port 8900 \\
+        --latency lognormal:1.2:0.5 --error-rate 0.02 --error-status 429,500
+
+then point the services at it:
+
+    OPENAI_BASE_URL=http://localhost:8900/v1 OPENAI_API_KEY=fake
+    ANTHROPIC_BASE_URL=http://localhost:8900 CLAUDE_API_KEY=fake
+
+Latency specs: fixed:S, uniform:A:B, normal:MEAN:STD, lognormal:MEDIAN:SIGMA
+(seconds), plus --per-token-ms for time proportional to completion length.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# -----------------------------
+# Canned content
+# -----------------------------
+SKILLS = ["Python", "SQL", "Docker", "React", "Git", "AWS", "Django", "Java"]
+KNOWLEDGE = [
+    "Algorithms",
+    "Data Structures",
+    "Database Systems",
+    "Machine Learning",
+    "Software Testing",
+    "Computer Networks",
+    "Web Development",
+]
+LEVELS = ["Basic", "Intermediate", "Advanced"]
+LANGUAGES = ["Python", "Java", "JavaScript", "C++", "C#", "Go", "SQL"]
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+
+def _rng(text: str) -> random.Random:
+    """Same prompt, same response"""
+    return random.Random(hashlib.sha256(text.encode()).hexdigest())
+
+
+def _levels(rng: random.Random, names: List[str], k: int) -> Dict[str, str]:
+    return {name: rng.choice(LEVELS) for name in rng.sample(names, k)}
+
+
+def _json_after(text: str, marker: str, end_marker: Optional[str] = None) -> Any:
+    """Parse the JSON value that follows marker in a prompt"""
+    if marker not in text:
+        return None
+    part = text.split(marker, 1)[1]
+    if end_marker and end_marker in part:
+        part = part.split(end_marker, 1)[0]
+    match = re.search(r"(\[.*\]|\{.*\})", part, re.DOTALL)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except ValueError:
+        return None
+
+
+def _question_texts(text: str) -> List[str]:
+    # questions are embedded as JSON or as a Python repr of the parsed list
+    return re.findall(r"""['"]question['"]\s*:\s*['"](.*?)['"]\s*,""", text)
+
+
+def _job_enrichment(text, rng):
+    return json.dumps(
+        {
+            "summary": "This career involves designing, building and maintaining "
+            "software systems with cross-functional teams.",
+            "skills": _levels(rng, SKILLS, 4),
+            "knowledge": _levels(rng, KNOWLEDGE, 3),
+        }
+    )
+
+
+def _job_skills(text, rng):
+    return json.dumps(_levels(rng, SKILLS, 4))
+
+
+def _job_knowledge(text, rng):
+    return json.dumps(_levels(rng, KNOWLEDGE, 3))
+
+
+def _job_summary(text, rng):
+    return (
+        "This career involves developing and maintaining applications, "
+        "collaborating with stakeholders and improving system reliability."
+    )
+
+
+def _user_skills_knowledge(text, rng):
+    return json.dumps(
+        {"skills": _levels(rng, SKILLS, 5), "knowledge": _levels(rng, KNOWLEDGE, 4)}
+    )
+
+
+def _user_profile(text, rng):
+    return (
+        "The user shows a solid foundation in programming and databases, with "
+        "practical project experience and accurate self-assessment. Strengths "
+        "include problem solving and backend development; weaker areas are "
+        "system design and testing. Recommended next steps are deeper study of "
+        "distributed systems and hands-on cloud deployment."
+    )
+
+
+def _topics_languages(text, rng):
+    topics = rng.sample(SKILLS + KNOWLEDGE, 5)
+    languages = [lang for lang in LANGUAGES if lang in topics]
+    return json.dumps({"topics": topics, "languages": languages})
+
+
+def _coding_questions(text, rng):
+    count_match = re.search(r"Generate (\d+) coding (?:problems|MCQs)", text)
+    count = int(count_match.group(1)) if count_match else 5
+    lang_match = re.search(r"in '([^']+)'", text)
+    lang = lang_match.group(1) if lang_match else "Python"
+    return json.dumps(
+        [
+            {
+                "question": f"What does this {lang} snippet print? (#{i + 1})",
+                "code": "x = [1, 2, 3]\nprint(sum(x[1:]))",
+                "language": lang,
+                "difficulty": DIFFICULTIES[min(i, 2)],
+                "category": "Coding",
+            }
+            for i in range(count)
+        ]
+    )
+
+
+def _non_coding_questions(text, rng):
+    count_match = re.search(r"Generate (\d+) non-coding", text)
+    count = min(int(count_match.group(1)) if count_match else 4, len(KNOWLEDGE))
+    return json.dumps(
+        [
+            {
+                "question": f"Explain the trade-offs of {topic}.",
+                "difficulty": DIFFICULTIES[min(i, 2)],
+                "category": "Non-coding",
+            }
+            for i, topic in enumerate(rng.sample(KNOWLEDGE, count))
+        ]
+    )
+
+
+def _mcqs(category: str):
+    def respond(text, rng):
+        questions = _question_texts(text) or ["Which statement is correct?"]
+        mcqs = []
+        for i, question in enumerate(questions):
+            mcq = {
+                "question": question,
+                "options": ["A. First", "B. Second", "C. Third", "D. Fourth"],
+                "answer": rng.choice("ABCD"),
+                "difficulty": DIFFICULTIES[i % 3],
+                "category": category,
+            }
+            if category == "Coding":
+                mcq.update(code="print(1 + 1)", language="Python")
+            mcqs.append(mcq)
+        return json.dumps(mcqs)
+
+    respond.__name__ = f"_mcqs_{category.lower().replace('-', '_')}"
+    return respond
+
+
+def _direct_mcqs(category: str):
+    # single-stage generation: the generated questions with options attached
+    generate = _coding_questions if category == "Coding" else _non_coding_questions
+
+    def respond(text, rng):
+        mcqs = [
+            dict(
+                question,
+                options=["A. First", "B. Second", "C. Third", "D. Fourth"],
+                answer=rng.choice("ABCD"),
+            )
+            for question in json.loads(generate(text, rng))
+        ]
+        return json.dumps(mcqs)
+
+    respond.__name__ = f"_direct_mcqs_{category.lower().replace('-', '_')}"
+    return respond
+
+
+def _validated_mcqs(text, rng):
+    # validation returns the same questions; the count must match the input
+    mcqs = _json_after(text, "MCQs to validate:") or _json_after(text, "Input MCQs:")
+    return json.dumps(mcqs if isinstance(mcqs, list) else [])
+
+
+def _roadmap(text, rng):
+    topics = rng.sample(SKILLS + KNOWLEDGE, 3)
+    return json.dumps(
+        {
+            "topics": {topic: rng.choice(LEVELS) for topic in topics},
+            "sub_topics": {
+                topic: [f"{topic} fundamentals", f"Applied {topic} project"]
+                for topic in topics
+            },
+        }
+    )
+
+
+def _refined_roadmap(text, rng):
+    draft = _json_after(text, "DRAFT ROADMAP:", "TASK:")
+    if not isinstance(draft, dict):
+        return _roadmap(text, rng)
+    draft["sub_topics"] = {
+        topic: [f"{sub} (hands-on, goal-aligned)" for sub in subs]
+        for topic, subs in (draft.get("sub_topics") or {}).items()
+    }
+    return json.dumps(draft)
+
+
+# first matching marker wins, so more specific prompts come first
+RESPONDERS: List[Tuple[str, Callable[[str, random.Random], str]]] = [
+    ("RETURN ITS SUMMARY, REQUIRED SKILLS AND REQUIRED KNOWLEDGE", _job_enrichment),
+    ("EXTRACT ALL REQUIRED SKILLS", _job_skills),
+    ("EXTRACT ALL REQUIRED KNOWLEDGE", _job_knowledge),
+    ("Summarize the following job description", _job_summary),
+    ("Analyze the following student's data", _user_skills_knowledge),
+    ("Write a concise, objective profile", _user_profile),
+    ("which of the extracted topics are programming languages", _topics_languages),
+    ("coding problems based on", _coding_questions),
+    ("non-coding conceptual questions", _non_coding_questions),
+    ("non-coding conceptual MCQs", _direct_mcqs("Non-coding")),
+    ("coding MCQs based on", _direct_mcqs("Coding")),
+    ("Convert the following coding questions", _mcqs("Coding")),
+    ("Convert the following non-coding questions", _mcqs("Non-coding")),
+    ("MCQs to validate:", _validated_mcqs),
+    ("Input MCQs:", _validated_mcqs),
+    ("CRITIQUE AND REFINE this draft career roadmap", _refined_roadmap),
+    ("Create a structured career roadmap", _roadmap),
+]
+
+
+def canned_response(prompt: str) -> Tuple[str, str]:
+    """(responder name, response text) for a prompt"""
+    rng = _rng(prompt)
+    for marker, responder in RESPONDERS:
+        if marker in prompt:
+            return responder.__name__, responder(prompt, rng)
+    return "default", "OK"
+
+
+# -----------------------------
+# Latency and error injection
+# -----------------------------
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class FakeLLMConfig:
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        per_token_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: Tuple[int, ...] = (429,),
+        seed: int = 0,
+    ):
+        self.latency = parse_latency(latency)
+        self.per_token_ms = per_token_ms
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        # one seeded stream for latency and errors: same run, same schedule
+        self.rng = random.Random(seed)
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+# characters per streamed delta (about four tokens)
+STREAM_CHUNK_CHARS = 16
+
+
+OPENAI_ERRORS = {
+    429: ("rate_limit_exceeded", "Rate limit reached for requests"),
+    500: ("server_error", "The server had an error processing your request"),
+    503: ("server_error", "The engine is currently overloaded"),
+}
+ANTHROPIC_ERRORS = {
+    429: ("rate_limit_error", "Number of requests has exceeded your rate limit"),
+    500: ("api_error", "Internal server error"),
+    529: ("overloaded_error", "Overloaded"),
+}
+
+
+def create_app(config: FakeLLMConfig) -> FastAPI:
+    app = FastAPI(title="Fake LLM server")
+    stats: Dict[str, Dict[str, int]] = {}
+
+    def count(route: str, outcome: str) -> None:
+        stats.setdefault(route, {}).setdefault(outcome, 0)
+        stats[route][outcome] += 1
+
+    def inject_error() -> Optional[int]:
+        if config.error_rate and config.rng.random() < config.error_rate:
+            return config.rng.choice(config.error_statuses)
+        return None
+
+    async def delay(completion: str) -> None:
+        seconds = config.latency(config.rng)
+        seconds += _tokens(completion) * config.per_token_ms / 1000
+        await asyncio.sleep(seconds)
+
+    async def stream_completion(
+        completion_id: str, model: str, content: str, usage: Optional[Dict]
+    ):
+        """chat.completion.chunk events; per-token time is spread over the deltas"""
+        await delay("")
+
+        def event(choices: List[Dict[str, Any]], **extra) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+                **extra,
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        def delta(fields: Dict[str, Any], finish_reason=None) -> str:
+            return event(
+                [{"index": 0, "delta": fields, "finish_reason": finish_reason}]
+            )
+
+        yield delta({"role": "assistant", "content": ""})
+        for i in range(0, len(content), STREAM_CHUNK_CHARS):
+            piece = content[i : i + STREAM_CHUNK_CHARS]
+            await asyncio.sleep(_tokens(piece) * config.per_token_ms / 1000)
+            yield delta({"content": piece})
+        yield delta({}, "stop")
+        if usage:
+            yield event([], usage=usage)
+        yield "data: [DONE]\n\n"
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+
+        status = inject_error()
+        if status:
+            count("openai", f"error_{status}")
+            await delay("")
+            code, message = OPENAI_ERRORS.get(status, ("server_error", "Error"))
+            return JSONResponse(
+                {"error": {"message": message, "type": code, "code": code}},
+                status_code=status,
+                headers={"retry-after": "1"} if status == 429 else None,
+            )
+
+        name, content = canned_response(prompt)
+        count("openai", name)
+        digest = hashlib.sha1(prompt.encode()).hexdigest()[:12]
+        completion_id = f"chatcmpl-fake-{digest}"
+        prompt_tokens, completion_tokens = _tokens(prompt), _tokens(content)
+        if body.get("stream"):
+            usage = None
+            if (body.get("stream_options") or {}).get("include_usage"):
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                }
+            return StreamingResponse(
+                stream_completion(
+                    completion_id, body.get("model", "gpt-4o"), content, usage
+                ),
+                media_type="text/event-stream",
+            )
+
+        await delay(content)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        prompt_parts = [str(body.get("system", ""))]
+        for message in body.get("messages", []):
+            content = message.get("content", "")
+            if isinstance(content, list):
+                content = "\n".join(block.get("text", "") for block in content)
+            prompt_parts.append(content)
+        prompt = "\n".join(prompt_parts)
+
+        status = inject_error()
+        if status:
+            count("anthropic", f"error_{status}")
+            await delay("")
+            code, message = ANTHROPIC_ERRORS.get(status, ("api_error", "Error"))
+            return JSONResponse(
+                {"type": "error", "error": {"type": code, "message": message}},
+                status_code=status,
+                headers={"retry-after": "1"} if status == 429 else None,
+            )
+
+        name, content = canned_response(prompt)
+        count("anthropic", name)
+        await delay(content)
+        return {
+            "id": f"msg_fake_{hashlib.sha1(prompt.encode()).hexdigest()[:12]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude"),
+            "content": [{"type": "text", "text": content}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": _tokens(prompt),
+                "output_tokens": _tokens(content),
+            },
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--per-token-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", default="429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(
+        latency=args.latency,
+        per_token_ms=args.per_token_ms,
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(s) for s in args.error_status.split(",")),
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
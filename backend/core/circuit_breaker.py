@@ -0,0 +1,93 @@
+# core/circuit_breaker.py
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for a remote dependency.
+
+    closed: calls go through; failure_threshold failures in a row open it.
+    open: calls fail at once with CircuitOpenError for reset_seconds.
+    half_open: a single trial call goes through; success closes the circuit,
+    failure opens it for another reset_seconds.
+
+    Callers run before_call() first and then report the outcome with
+    record_success() or record_failure().
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started: Optional[float] = None
+        self._stats = {"opened": 0, "rejected": 0, "failures": 0, "successes": 0}
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    self._reject_locked()
+                self._state = "half_open"
+                self._trial_started = None
+            if self._state == "half_open":
+                # a trial that never reported back (e.g. cancelled) expires
+                now = time.monotonic()
+                if (
+                    self._trial_started is not None
+                    and now - self._trial_started < self.reset_seconds
+                ):
+                    self._reject_locked()
+                self._trial_started = now
+
+    def _reject_locked(self) -> None:
+        self._stats["rejected"] += 1
+        retry_in = self.reset_seconds - (time.monotonic() - self._opened_at)
+        raise CircuitOpenError(
+            f"{self.name} is unavailable (circuit {self._state}, "
+            f"retry in {max(retry_in, 0):.0f}s)"
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._stats["successes"] += 1
+            if self._state != "closed":
+                print(f"[Circuit Breaker] {self.name} recovered, circuit closed")
+            self._state = "closed"
+            self._failures = 0
+            self._trial_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            self._trial_started = None
+            if self._state == "half_open" or (
+                self._state == "closed" and self._failures >= self.failure_threshold
+            ):
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._stats["opened"] += 1
+                print(
+                    f"[Circuit Breaker] {self.name} failed {self._failures} times, "
+                    f"failing fast for {self.reset_seconds:.0f}s"
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                **self._stats,
+            }
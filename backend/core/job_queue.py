@@ -0,0 +1,267 @@
+# core/job_queue.py
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from core.cache_backends import BASE_DIR
+
+JOB_QUEUE_PATH = os.getenv(
+    "JOB_QUEUE_PATH", os.path.join(BASE_DIR, "data", "jobs", "job_queue.sqlite3")
+)
+JOB_QUEUE_WORKERS = int(os.getenv("JOB_QUEUE_WORKERS", "4"))
+# a job that was running when the process died this many times is given up
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# finished jobs are kept this long for status polling
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+
+ACTIVE_STATUSES = ("queued", "running")
+JOB_COLUMNS = (
+    "id",
+    "kind",
+    "status",
+    "result",
+    "error",
+    "attempts",
+    "created_at",
+    "started_at",
+    "finished_at",
+)
+# the API reports the id as job_id
+JOB_FIELDS = ("job_id",) + JOB_COLUMNS[1:]
+
+
+class JobQueue:
+    """
+    Local background job queue with state persisted in SQLite.
+
+    Handlers are registered per job kind and may be plain or async
+    functions; async handlers run on the server's event loop. A fixed pool
+    of worker threads claims queued jobs oldest-first. Submitting a job
+    that is already queued or running for the same key returns the
+    existing job id, so client retries don't duplicate work. Jobs left
+    running by a previous process are re-queued on start, unless they have
+    already been started max_attempts times; those are marked failed so a
+    job that crashes the process isn't retried forever.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_workers: int = JOB_QUEUE_WORKERS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ):
+        self.path = path
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._workers: List[threading.Thread] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                dedupe_key TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)"
+        )
+        self._conn.commit()
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        self._handlers[kind] = handler
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start the worker pool; call from the server's startup hook"""
+        self._loop = loop
+        with self._lock:
+            if self._workers:
+                return
+            # a previous process died mid-job: run those again, unless they
+            # keep taking the process down with them
+            abandoned = self._conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? "
+                "WHERE status = 'running' AND attempts >= ?",
+                (
+                    time.time(),
+                    f"Interrupted {self.max_attempts} times, giving up",
+                    self.max_attempts,
+                ),
+            ).rowcount
+            recovered = self._conn.execute(
+                "UPDATE jobs SET status = 'queued' WHERE status = 'running'"
+            ).rowcount
+            self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (time.time() - JOB_RETENTION_SECONDS,),
+            )
+            self._conn.commit()
+            for i in range(self.max_workers):
+                worker = threading.Thread(
+                    target=self._work, name=f"job-worker-{i}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+        print(
+            f"✓ Job queue started with {self.max_workers} workers"
+            f" ({recovered} interrupted jobs re-queued, {abandoned} failed)"
+        )
+
+    # -----------------------------
+    # Submission and status
+    # -----------------------------
+    def submit(
+        self, kind: str, payload: Dict[str, Any], dedupe_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        with self._lock:
+            if dedupe_key is not None:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE kind = ? AND dedupe_key = ? "
+                    "AND status IN (?, ?) ORDER BY created_at DESC LIMIT 1",
+                    (kind, dedupe_key, *ACTIVE_STATUSES),
+                ).fetchone()
+                if row:
+                    return self._get_locked(row[0])
+
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, dedupe_key, payload, status, created_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, kind, dedupe_key, json.dumps(payload), time.time()),
+            )
+            self._conn.commit()
+            self._wakeup.notify()
+            return self._get_locked(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._get_locked(job_id)
+
+    def _get_locked(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(JOB_FIELDS, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        if job["status"] == "queued":
+            job["queue_position"] = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at <= ?",
+                (job["created_at"],),
+            ).fetchone()[0]
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+                ).fetchall()
+            )
+        return {"workers": self.max_workers, "jobs": counts}
+
+    # -----------------------------
+    # Workers
+    # -----------------------------
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            while True:
+                row = self._conn.execute(
+                    "SELECT id, kind, payload FROM jobs WHERE status = 'queued' "
+                    "ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', started_at = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (time.time(), row[0]),
+                    )
+                    self._conn.commit()
+                    job_id, kind, payload = row
+                    return {"id": job_id, "kind": kind, "payload": json.loads(payload)}
+                self._wakeup.wait(timeout=5)
+
+    def _finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Any = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+                "WHERE id = ?",
+                (
+                    status,
+                    json.dumps(result, default=str) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+            self._conn.commit()
+
+    def _run_handler(self, kind: str, payload: Dict[str, Any]) -> Any:
+        handler = self._handlers[kind]
+        if asyncio.iscoroutinefunction(handler):
+            # async pipelines share the server loop (and its pooled async clients)
+            if self._loop is None:
+                return asyncio.run(handler(payload))
+            future = asyncio.run_coroutine_threadsafe(handler(payload), self._loop)
+            return future.result()
+        return handler(payload)
+
+    def _work(self) -> None:
+        while True:
+            job = self._claim()
+            started = time.perf_counter()
+            print(f"[Job Queue] Running {job['kind']} job {job['id']}")
+            try:
+                result = self._run_handler(job["kind"], job["payload"])
+                # handlers report failures as {"error": ...} like the routes do
+                if isinstance(result, dict) and result.get("error"):
+                    self._finish(job["id"], "failed", result, str(result["error"]))
+                else:
+                    self._finish(job["id"], "succeeded", result)
+            except Exception as e:
+                traceback.print_exc()
+                self._finish(job["id"], "failed", error=str(e))
+            print(
+                f"[Job Queue] Finished {job['kind']} job {job['id']} "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+
+
+job_queue = JobQueue(JOB_QUEUE_PATH)
@@ -0,0 +1,78 @@
+# core/json_stream.py
+
+import json
+from typing import Any, List
+
+
+class JSONArrayStreamParser:
+    """
+    Incremental parser for a JSON array that arrives in chunks, e.g. streamed
+    LLM output. feed() returns each top-level item as soon as it is complete,
+    so callers can act on the first item while the rest is still generating.
+
+    Text before the opening "[" (prose, a markdown fence) and everything after
+    the closing "]" is ignored. Items that are not valid JSON are skipped and
+    counted in `errors`.
+    """
+
+    def __init__(self):
+        self._item: List[str] = []
+        # 0 before the array, 1 between items, > 1 inside a nested item
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.done = False
+        self.items = 0
+        self.errors = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk of text and return the items it completed"""
+        items: List[Any] = []
+        for ch in chunk:
+            if self.done:
+                break
+            if self._depth == 0:
+                if ch == "[":
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._item.append(ch)
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 1 and ch in ",]":
+                # end of a scalar item (objects and arrays flush on close)
+                self._flush(items)
+                if ch == "]":
+                    self._depth = 0
+                    self.done = True
+                continue
+
+            self._item.append(ch)
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    self._flush(items)
+        return items
+
+    def _flush(self, items: List[Any]) -> None:
+        text = "".join(self._item).strip()
+        self._item = []
+        if not text:
+            return
+        try:
+            items.append(json.loads(text))
+            self.items += 1
+        except json.JSONDecodeError:
+            self.errors += 1
+            print(f"[JSON Stream] Skipping malformed item: {text[:80]}")
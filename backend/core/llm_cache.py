@@ -0,0 +1,159 @@
+# core/llm_cache.py
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from core.cache_backends import CACHE_DIR, CacheBackend, SQLiteCacheBackend
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_responses.sqlite3"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+
+# lets a caller opt out of caching for everything it runs, including LangChain chains
+_cache_disabled: ContextVar[bool] = ContextVar("llm_cache_disabled", default=False)
+
+
+@contextmanager
+def llm_cache_disabled():
+    """Bypass the LLM response cache for every call made inside this block"""
+    token = _cache_disabled.set(True)
+    try:
+        yield
+    finally:
+        _cache_disabled.reset(token)
+
+
+def make_llm_cache_key(
+    provider: str,
+    model: str,
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    prompt: Any,
+) -> str:
+    """
+    Content-addressed key: provider, model and sampling params plus a digest
+    of the prompt (a string or a list of chat messages).
+    """
+    prompt_text = prompt if isinstance(prompt, str) else json.dumps(prompt, sort_keys=True)
+    prompt_digest = hashlib.sha256(prompt_text.encode()).hexdigest()
+    return f"{provider}:{model}:{temperature}:{max_tokens}:{prompt_digest}"
+
+
+class LLMResponseCache:
+    """
+    Disk-backed cache of LLM text responses, shared by every call site.
+    Expiry and size limits are enforced by the SQLite backend.
+    """
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def is_active(self) -> bool:
+        return self.enabled and not _cache_disabled.get()
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.is_active():
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"[LLM Cache WARNING] Lookup failed: {e}")
+            value = None
+        with self._lock:
+            self._stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        if not self.is_active() or not value:
+            return
+        try:
+            self.backend.set(key, value)
+        except Exception as e:
+            print(f"[LLM Cache WARNING] Store failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["entries"] = self.backend.count()
+        return stats
+
+
+llm_response_cache = LLMResponseCache(
+    backend=SQLiteCacheBackend(
+        LLM_CACHE_PATH,
+        table="llm_responses",
+        ttl_seconds=LLM_CACHE_TTL_SECONDS,
+        max_entries=LLM_CACHE_MAX_ENTRIES,
+    ),
+    enabled=LLM_CACHE_ENABLED,
+)
+
+
+# -----------------------------
+# LangChain adapter
+# -----------------------------
+_langchain_cache_installed = False
+
+
+def install_langchain_cache() -> None:
+    """
+    Route every LangChain LLM / chat model (LLMChain, ChatOpenAI.invoke,
+    ClaudeWrapper) through the shared response cache.
+    Models created with cache=False keep bypassing it.
+    """
+    global _langchain_cache_installed
+    if _langchain_cache_installed:
+        return
+
+    from langchain_core.caches import BaseCache
+    from langchain_core.globals import set_llm_cache
+    from langchain_core.load import dumps, loads
+
+    class LangChainLLMCache(BaseCache):
+        """BaseCache implementation storing generations in llm_response_cache"""
+
+        def _key(self, prompt: str, llm_string: str) -> str:
+            # llm_string is LangChain's serialization of the model and its params
+            # (model name, temperature, max_tokens, ...)
+            llm_digest = hashlib.sha256(llm_string.encode()).hexdigest()[:16]
+            return make_llm_cache_key("langchain", llm_digest, None, None, prompt)
+
+        def lookup(self, prompt: str, llm_string: str):
+            raw = llm_response_cache.get(self._key(prompt, llm_string))
+            if raw is None:
+                return None
+            try:
+                generations = [loads(item) for item in json.loads(raw)]
+            except Exception as e:
+                print(f"[LLM Cache WARNING] Failed to load cached generation: {e}")
+                return None
+            # lets the metrics callback count this run as a cache hit
+            for generation in generations:
+                generation.generation_info = {
+                    **(generation.generation_info or {}),
+                    "llm_cache_hit": True,
+                }
+            return generations
+
+        def update(self, prompt: str, llm_string: str, return_val) -> None:
+            llm_response_cache.set(
+                self._key(prompt, llm_string),
+                json.dumps([dumps(generation) for generation in return_val]),
+            )
+
+        def clear(self, **kwargs: Any) -> None:
+            llm_response_cache.backend.clear()
+
+    set_llm_cache(LangChainLLMCache())
+    _langchain_cache_installed = True
@@ -0,0 +1,383 @@
+# core/llm_gateway.py
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import openai
+from dotenv import load_dotenv
+
+from core.circuit_breaker import CircuitBreaker
+from core.llm_cache import llm_response_cache, make_llm_cache_key
+from core.llm_metrics import create_langchain_metrics_handler, llm_metrics
+from core.llm_scheduler import AsyncSchedulingTransport, SchedulingTransport
+
+# -----------------------------
+# Config
+# -----------------------------
+load_dotenv()
+
+DEFAULT_OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+# point at benchmarks/fake_llm_server.py for offline benchmarks
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+# SDK retries for connection errors and 5xx. 429s are retried only by the
+# scheduling transport, which marks its final 429 x-should-retry: false so the
+# SDK doesn't retry it again
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+# one connection pool per provider, shared by every service and thread
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "16"))
+# local Claude sidecar (services/claude_agent/claude_service.py)
+CLAUDE_SIDECAR_URL = os.getenv("CLAUDE_SIDECAR_URL", "http://localhost:5001")
+# the model behind the sidecar, for cost attribution in the LLM metrics
+CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-opus-4-5-20251101")
+# a down sidecar is noticed within the connect timeout; validation is slow,
+# so reads get longer
+CLAUDE_CONNECT_TIMEOUT_SECONDS = float(os.getenv("CLAUDE_CONNECT_TIMEOUT_SECONDS", "2"))
+CLAUDE_READ_TIMEOUT_SECONDS = float(os.getenv("CLAUDE_READ_TIMEOUT_SECONDS", "120"))
+# consecutive sidecar failures before calls fail fast, and for how long
+CLAUDE_BREAKER_FAILURES = int(os.getenv("CLAUDE_BREAKER_FAILURES", "3"))
+CLAUDE_BREAKER_RESET_SECONDS = float(os.getenv("CLAUDE_BREAKER_RESET_SECONDS", "30"))
+
+
+class LLMGateway:
+    """
+    Single owner of the LLM clients used by every service.
+
+    Holds one pooled sync and one pooled async HTTP client for OpenAI,
+    created lazily and shared by the raw chat API and the LangChain models
+    it hands out, so pooling, timeouts, retries and token accounting are
+    configured in one place. The Claude sidecar gets its own pair of pooled
+    clients and a circuit breaker shared by every ClaudeWrapper.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._openai_client: Optional[openai.OpenAI] = None
+        self._async_openai_client: Optional[openai.AsyncOpenAI] = None
+        self._http_client: Optional[httpx.Client] = None
+        self._async_http_client: Optional[httpx.AsyncClient] = None
+        self._claude_http_client: Optional[httpx.Client] = None
+        self._async_claude_http_client: Optional[httpx.AsyncClient] = None
+        self.claude_breaker = CircuitBreaker(
+            "Claude sidecar", CLAUDE_BREAKER_FAILURES, CLAUDE_BREAKER_RESET_SECONDS
+        )
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self._handlers: Dict[str, Any] = {}
+
+    # -----------------------------
+    # Pooled clients
+    # -----------------------------
+    def _api_key(self) -> str:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found. Please set it in your .env file.")
+        return api_key
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        )
+
+    @property
+    def http_client(self) -> httpx.Client:
+        with self._lock:
+            if self._http_client is None:
+                # every OpenAI request waits for its model's RPM/TPM budget
+                self._http_client = httpx.Client(
+                    transport=SchedulingTransport(
+                        httpx.HTTPTransport(limits=self._limits())
+                    ),
+                    timeout=LLM_TIMEOUT_SECONDS,
+                )
+            return self._http_client
+
+    @property
+    def async_http_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._async_http_client is None:
+                self._async_http_client = httpx.AsyncClient(
+                    transport=AsyncSchedulingTransport(
+                        httpx.AsyncHTTPTransport(limits=self._limits())
+                    ),
+                    timeout=LLM_TIMEOUT_SECONDS,
+                )
+            return self._async_http_client
+
+    def _claude_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            CLAUDE_READ_TIMEOUT_SECONDS, connect=CLAUDE_CONNECT_TIMEOUT_SECONDS
+        )
+
+    @property
+    def claude_http_client(self) -> httpx.Client:
+        with self._lock:
+            if self._claude_http_client is None:
+                self._claude_http_client = httpx.Client(
+                    limits=self._limits(), timeout=self._claude_timeout()
+                )
+            return self._claude_http_client
+
+    @property
+    def async_claude_http_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._async_claude_http_client is None:
+                self._async_claude_http_client = httpx.AsyncClient(
+                    limits=self._limits(), timeout=self._claude_timeout()
+                )
+            return self._async_claude_http_client
+
+    @property
+    def openai_client(self) -> openai.OpenAI:
+        http_client = self.http_client
+        with self._lock:
+            if self._openai_client is None:
+                self._openai_client = openai.OpenAI(
+                    api_key=self._api_key(),
+                    base_url=OPENAI_BASE_URL,
+                    http_client=http_client,
+                    timeout=LLM_TIMEOUT_SECONDS,
+                    max_retries=LLM_MAX_RETRIES,
+                )
+            return self._openai_client
+
+    @property
+    def async_openai_client(self) -> openai.AsyncOpenAI:
+        http_client = self.async_http_client
+        with self._lock:
+            if self._async_openai_client is None:
+                self._async_openai_client = openai.AsyncOpenAI(
+                    api_key=self._api_key(),
+                    base_url=OPENAI_BASE_URL,
+                    http_client=http_client,
+                    timeout=LLM_TIMEOUT_SECONDS,
+                    max_retries=LLM_MAX_RETRIES,
+                )
+            return self._async_openai_client
+
+    # -----------------------------
+    # Chat API
+    # -----------------------------
+    def _build_request(
+        self,
+        prompt: str,
+        system: Optional[str],
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        json_mode: bool,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Chat-completions kwargs plus the response-cache key for them"""
+        messages: List[Dict[str, str]] = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+
+        request = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if json_mode:
+            request["response_format"] = {"type": "json_object"}
+
+        provider = "openai-json" if json_mode else "openai"
+        cache_key = make_llm_cache_key(provider, model, temperature, max_tokens, messages)
+        return cache_key, request
+
+    def chat(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        model: str = DEFAULT_OPENAI_MODEL,
+        max_tokens: int = 2000,
+        temperature: float = 0.2,
+        json_mode: bool = False,
+        use_cache: bool = True,
+        call_site: Optional[str] = None,
+    ) -> str:
+        """
+        One chat completion through the pooled OpenAI client.
+        Identical requests are served from the shared LLM response cache
+        unless use_cache is False. json_mode constrains the output to a JSON object.
+        call_site names the prompt in the LLM metrics.
+        """
+        cache_key, request = self._build_request(
+            prompt, system, model, max_tokens, temperature, json_mode
+        )
+        started = time.perf_counter()
+        if use_cache:
+            cached = llm_response_cache.get(cache_key)
+            if cached is not None:
+                self._record_cache_hit(model, started, call_site)
+                return cached
+
+        with llm_metrics.track_call() as call:
+            try:
+                resp = self.openai_client.chat.completions.create(**request)
+            except Exception:
+                self._record_error(model, started, call_site, call["retries"])
+                raise
+        self._record_usage(model, resp, started, call_site, call["retries"])
+        content = resp.choices[0].message.content.strip()
+
+        if use_cache:
+            llm_response_cache.set(cache_key, content)
+        return content
+
+    async def achat(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        model: str = DEFAULT_OPENAI_MODEL,
+        max_tokens: int = 2000,
+        temperature: float = 0.2,
+        json_mode: bool = False,
+        use_cache: bool = True,
+        call_site: Optional[str] = None,
+    ) -> str:
+        """Async version of chat using the pooled AsyncOpenAI client"""
+        cache_key, request = self._build_request(
+            prompt, system, model, max_tokens, temperature, json_mode
+        )
+        started = time.perf_counter()
+        if use_cache:
+            cached = await asyncio.to_thread(llm_response_cache.get, cache_key)
+            if cached is not None:
+                self._record_cache_hit(model, started, call_site)
+                return cached
+
+        with llm_metrics.track_call() as call:
+            try:
+                resp = await self.async_openai_client.chat.completions.create(
+                    **request
+                )
+            except Exception:
+                self._record_error(model, started, call_site, call["retries"])
+                raise
+        self._record_usage(model, resp, started, call_site, call["retries"])
+        content = resp.choices[0].message.content.strip()
+
+        if use_cache:
+            await asyncio.to_thread(llm_response_cache.set, cache_key, content)
+        return content
+
+    # -----------------------------
+    # LangChain adapters
+    # -----------------------------
+    def langchain_chat_model(
+        self, model: str = DEFAULT_OPENAI_MODEL, temperature: float = 0.2, **kwargs
+    ):
+        """ChatOpenAI that reuses the gateway's pooled HTTP clients"""
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            api_key=self._api_key(),
+            base_url=OPENAI_BASE_URL,
+            http_client=self.http_client,
+            http_async_client=self.async_http_client,
+            timeout=LLM_TIMEOUT_SECONDS,
+            max_retries=LLM_MAX_RETRIES,
+            callbacks=[self._langchain_handler("openai")],
+            **kwargs,
+        )
+
+    def claude_llm(self, route: str, temperature: float = 0.0):
+        """ClaudeWrapper bound to a route of the local Claude sidecar"""
+        from services.claude_agent.claude_wrapper import ClaudeWrapper
+
+        return ClaudeWrapper(
+            endpoint_url=f"{CLAUDE_SIDECAR_URL}/{route.lstrip('/')}",
+            model_name=CLAUDE_MODEL,
+            temperature=temperature,
+            http_client=self.claude_http_client,
+            async_http_client=self.async_claude_http_client,
+            breaker=self.claude_breaker,
+            callbacks=[self._langchain_handler("claude-sidecar")],
+        )
+
+    def _langchain_handler(self, provider: str):
+        """One metrics callback handler per provider, shared by its models"""
+        with self._lock:
+            if provider not in self._handlers:
+                self._handlers[provider] = create_langchain_metrics_handler(
+                    provider, on_usage=self._add_usage
+                )
+            return self._handlers[provider]
+
+    # -----------------------------
+    # Accounting
+    # -----------------------------
+    def _record_cache_hit(
+        self, model: str, started: float, call_site: Optional[str]
+    ) -> None:
+        llm_metrics.record(
+            "openai",
+            model,
+            time.perf_counter() - started,
+            call_site=call_site,
+            cache_hit=True,
+        )
+
+    def _record_error(
+        self, model: str, started: float, call_site: Optional[str], retries: int
+    ) -> None:
+        llm_metrics.record(
+            "openai",
+            model,
+            time.perf_counter() - started,
+            call_site=call_site,
+            retries=retries,
+            error=True,
+        )
+
+    def _record_usage(
+        self,
+        model: str,
+        resp,
+        started: float,
+        call_site: Optional[str],
+        retries: int,
+    ) -> None:
+        usage = resp.usage
+        llm_metrics.record(
+            "openai",
+            model,
+            time.perf_counter() - started,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            call_site=call_site,
+            retries=retries,
+        )
+        if not usage:
+            return
+        self._add_usage(model, usage.prompt_tokens, usage.completion_tokens)
+        print(
+            f"[OpenAI] tokens: prompt={usage.prompt_tokens}, "
+            f"completion={usage.completion_tokens}"
+        )
+
+    def _add_usage(self, model: str, prompt_tokens: int, completion_tokens: int):
+        """Per-model totals for chat/achat and every LangChain model handed out"""
+        with self._lock:
+            totals = self._usage.setdefault(
+                model, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+            )
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {model: dict(usage) for model, usage in self._usage.items()}
+
+
+llm_gateway = LLMGateway()
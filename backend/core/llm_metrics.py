@@ -0,0 +1,359 @@
+# core/llm_metrics.py
+
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# -----------------------------
+# Attribution
+# -----------------------------
+_call_site: ContextVar[str] = ContextVar("llm_call_site", default="unknown")
+_pipeline_run: ContextVar[Optional[str]] = ContextVar("llm_pipeline_run", default=None)
+# mutable record of the call in flight, so transports can report retries
+_current_call: ContextVar[Optional[Dict[str, int]]] = ContextVar(
+    "llm_current_call", default=None
+)
+
+
+@contextmanager
+def llm_call_site(name: str):
+    """Attribute every LLM call made inside this block to a call site"""
+    token = _call_site.set(name)
+    try:
+        yield
+    finally:
+        _call_site.reset(token)
+
+
+@contextmanager
+def pipeline_run(user_test_id: str):
+    """Attribute every LLM call made inside this block to a user_test_id run"""
+    token = _pipeline_run.set(user_test_id)
+    try:
+        yield
+    finally:
+        _pipeline_run.reset(token)
+
+
+def current_call_site() -> str:
+    return _call_site.get()
+
+
+def note_retry() -> None:
+    """Called by transports when the call in flight is retried"""
+    call = _current_call.get()
+    if call is not None:
+        call["retries"] += 1
+
+
+# USD per 1M tokens (input, output)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "claude-opus-4-5": (5.00, 25.00),
+}
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+MAX_TRACKED_RUNS = 500
+
+COUNTER_METRICS = {
+    "calls": ("llm_calls_total", "LLM calls by outcome"),
+    "cache_hits": ("llm_cache_hits_total", "LLM calls served from cache"),
+    "retries": ("llm_retries_total", "LLM request retries"),
+    "cost": ("llm_cost_usd_total", "Estimated LLM spend in USD"),
+}
+
+
+def _cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    # longest prefix first so gpt-4o-mini isn't priced as gpt-4o
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(name):
+            input_price, output_price = MODEL_PRICES[name]
+            cost = prompt_tokens * input_price + completion_tokens * output_price
+            return cost / 1e6
+    return 0.0
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    def escape(value: str) -> str:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        return value.replace("\n", " ")
+
+    return ",".join(f'{k}="{escape(v)}"' for k, v in labels.items())
+
+
+class LLMMetrics:
+    """
+    Aggregates every LLM call (OpenAI, LangChain chains, Claude sidecar) by
+    provider, model and call site, and keeps per-run totals for the most
+    recent user_test_id pipeline runs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str, str], _Histogram] = {}
+        self._tokens: Dict[Tuple[str, str, str, str], _Histogram] = {}
+        self._counters: Dict[str, Dict[Tuple[str, ...], float]] = {
+            name: {} for name in COUNTER_METRICS
+        }
+        self._runs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @contextmanager
+    def track_call(self):
+        """Collect retries reported by transports for the enclosed call"""
+        call = {"retries": 0}
+        token = _current_call.set(call)
+        try:
+            yield call
+        finally:
+            _current_call.reset(token)
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        latency: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        call_site: Optional[str] = None,
+        retries: int = 0,
+        cache_hit: bool = False,
+        error: bool = False,
+    ) -> None:
+        call_site = call_site or _call_site.get()
+        run_id = _pipeline_run.get()
+        key = (provider, model, call_site)
+        status = "error" if error else ("cache_hit" if cache_hit else "ok")
+        cost = 0.0 if cache_hit else _cost(model, prompt_tokens, completion_tokens)
+
+        with self._lock:
+            self._latency.setdefault(key, _Histogram(LATENCY_BUCKETS)).observe(latency)
+            if not cache_hit and not error:
+                for kind, count in (
+                    ("prompt", prompt_tokens),
+                    ("completion", completion_tokens),
+                ):
+                    self._tokens.setdefault(
+                        key + (kind,), _Histogram(TOKEN_BUCKETS)
+                    ).observe(count)
+            self._bump("calls", key + (status,))
+            if cache_hit:
+                self._bump("cache_hits", key)
+            if retries:
+                self._bump("retries", key, retries)
+            if cost:
+                self._bump("cost", key, cost)
+            if run_id:
+                self._record_run(
+                    run_id,
+                    call_site,
+                    latency,
+                    prompt_tokens,
+                    completion_tokens,
+                    cost,
+                    cache_hit,
+                    error,
+                )
+
+    def _bump(self, name: str, key: Tuple[str, ...], amount: float = 1) -> None:
+        counter = self._counters[name]
+        counter[key] = counter.get(key, 0) + amount
+
+    def _record_run(
+        self,
+        run_id: str,
+        call_site: str,
+        latency: float,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cost: float,
+        cache_hit: bool,
+        error: bool,
+    ) -> None:
+        run = self._runs.pop(run_id, None) or {
+            "calls": 0,
+            "cache_hits": 0,
+            "errors": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cost_usd": 0.0,
+            "llm_seconds": 0.0,
+            "call_sites": {},
+        }
+        run["calls"] += 1
+        run["cache_hits"] += int(cache_hit)
+        run["errors"] += int(error)
+        run["prompt_tokens"] += prompt_tokens
+        run["completion_tokens"] += completion_tokens
+        run["cost_usd"] += cost
+        run["llm_seconds"] += latency
+        site = run["call_sites"].setdefault(
+            call_site, {"calls": 0, "llm_seconds": 0.0}
+        )
+        site["calls"] += 1
+        site["llm_seconds"] += latency
+        # most recently active runs last; drop the oldest past the limit
+        self._runs[run_id] = run
+        while len(self._runs) > MAX_TRACKED_RUNS:
+            self._runs.popitem(last=False)
+
+    def run_summary(self, user_test_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            run = self._runs.get(user_test_id)
+            if run is None:
+                return None
+            summary = dict(
+                run, call_sites={k: dict(v) for k, v in run["call_sites"].items()}
+            )
+        summary["cost_usd"] = round(summary["cost_usd"], 6)
+        summary["llm_seconds"] = round(summary["llm_seconds"], 3)
+        return summary
+
+    # -----------------------------
+    # Prometheus text exposition
+    # -----------------------------
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        base = ("provider", "model", "call_site")
+
+        with self._lock:
+            self._render_histograms(
+                lines,
+                "llm_call_duration_seconds",
+                "LLM call wall time",
+                self._latency,
+                base,
+            )
+            self._render_histograms(
+                lines,
+                "llm_call_tokens",
+                "Tokens per LLM call",
+                self._tokens,
+                base + ("kind",),
+            )
+            for name, (metric, help_text) in COUNTER_METRICS.items():
+                label_names = base + ("status",) if name == "calls" else base
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    labels = _labels(dict(zip(label_names, key)))
+                    lines.append(f"{metric}{{{labels}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def _render_histograms(self, lines, metric, help_text, histograms, label_names):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for key, hist in sorted(histograms.items()):
+            labels = _labels(dict(zip(label_names, key)))
+            cumulative = 0
+            for bound, count in zip(hist.buckets + ("+Inf",), hist.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{labels}}} {hist.sum}")
+            lines.append(f"{metric}_count{{{labels}}} {cumulative}")
+
+
+llm_metrics = LLMMetrics()
+
+
+# -----------------------------
+# LangChain callback handler
+# -----------------------------
+def create_langchain_metrics_handler(
+    provider: str,
+    on_usage: Optional[Callable[[str, int, int], None]] = None,
+):
+    """
+    Callback handler recording every LangChain LLM run into llm_metrics.
+    The call site comes from the run's `call_site` metadata, falling back
+    to the llm_call_site context. on_usage(model, prompt_tokens,
+    completion_tokens) is also called for each uncached completion.
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    from core.prompt_budget import count_tokens
+
+    class LLMMetricsCallbackHandler(BaseCallbackHandler):
+        def __init__(self):
+            self._runs: Dict[Any, Dict[str, Any]] = {}
+
+        def _start(self, run_id, prompt_text, metadata, invocation_params):
+            params = invocation_params or {}
+            self._runs[run_id] = {
+                "started": time.perf_counter(),
+                "call_site": (metadata or {}).get("call_site")
+                or current_call_site(),
+                "model": params.get("model_name") or params.get("model") or provider,
+                "prompt_text": prompt_text,
+            }
+
+        def on_llm_start(
+            self, serialized, prompts, *, run_id, metadata=None, **kwargs
+        ):
+            text = "\n".join(prompts)
+            self._start(run_id, text, metadata, kwargs.get("invocation_params"))
+
+        def on_chat_model_start(
+            self, serialized, messages, *, run_id, metadata=None, **kwargs
+        ):
+            text = "\n".join(str(m.content) for batch in messages for m in batch)
+            self._start(run_id, text, metadata, kwargs.get("invocation_params"))
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            run = self._runs.pop(run_id, None)
+            if run is None:
+                return
+            generations = [g for batch in response.generations for g in batch]
+            cache_hit = bool(
+                generations
+                and (generations[0].generation_info or {}).get("llm_cache_hit")
+            )
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt_tokens = usage.get("prompt_tokens")
+            completion_tokens = usage.get("completion_tokens")
+            if not cache_hit and prompt_tokens is None:
+                # the Claude sidecar doesn't report usage; estimate it
+                prompt_tokens = count_tokens(run["prompt_text"])
+                completion_tokens = count_tokens("".join(g.text for g in generations))
+            llm_metrics.record(
+                provider,
+                run["model"],
+                time.perf_counter() - run["started"],
+                prompt_tokens=prompt_tokens or 0,
+                completion_tokens=completion_tokens or 0,
+                call_site=run["call_site"],
+                cache_hit=cache_hit,
+            )
+            if on_usage is not None and not cache_hit:
+                on_usage(run["model"], prompt_tokens or 0, completion_tokens or 0)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            run = self._runs.pop(run_id, None)
+            if run is None:
+                return
+            llm_metrics.record(
+                provider,
+                run["model"],
+                time.perf_counter() - run["started"],
+                call_site=run["call_site"],
+                error=True,
+            )
+
+    return LLMMetricsCallbackHandler()
@@ -0,0 +1,415 @@
+# core/llm_scheduler.py
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from core.llm_metrics import note_retry
+
+# -----------------------------
+# Priorities
+# -----------------------------
+PRIORITY_INTERACTIVE = 0  # a user is waiting on the response
+PRIORITY_BACKGROUND = 1  # precomputation, offline enrichment, prefetch
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """Schedule every LLM call made inside this block at the given priority"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+# -----------------------------
+# Config
+# -----------------------------
+# per-model budgets, e.g. '{"gpt-4o": {"rpm": 500, "tpm": 30000}}'
+DEFAULT_RATE_LIMITS = {"gpt-4o": {"rpm": 500, "tpm": 30000}}
+LLM_RATE_LIMITS = (
+    json.loads(os.getenv("LLM_RATE_LIMITS") or "null") or DEFAULT_RATE_LIMITS
+)
+LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "4"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+# completion budget assumed when a request doesn't set max_tokens
+DEFAULT_COMPLETION_TOKENS = 1000
+
+
+class TokenBucket:
+    """Continuously refilling budget of `per_minute` units"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # a request bigger than the whole budget waits for a full bucket
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def give(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _Waiter:
+    def __init__(self, model: str, tokens: int, priority: int, grant):
+        self.model = model
+        self.tokens = tokens
+        self.priority = priority
+        self.grant = grant
+        self.enqueued_at = time.monotonic()
+        self.cancelled = False
+
+
+class LLMScheduler:
+    """
+    Client-side admission control for LLM requests.
+
+    Each model has a requests-per-minute and a tokens-per-minute bucket.
+    Calls queue per model by (priority, arrival) and a dispatcher thread
+    admits the head of each queue once both buckets have room, so
+    interactive requests always go ahead of background work. Models
+    without a configured budget are admitted immediately.
+    """
+
+    def __init__(self, rate_limits: Dict[str, Dict[str, float]]):
+        self._buckets: Dict[str, Tuple[TokenBucket, TokenBucket]] = {
+            model: (TokenBucket(limits["rpm"]), TokenBucket(limits["tpm"]))
+            for model, limits in rate_limits.items()
+        }
+        self._queues: Dict[str, List[Tuple[int, int, _Waiter]]] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stats = {
+            name: {"admitted": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+        self._rate_limited = 0
+        self._retries = 0
+
+    # -----------------------------
+    # Admission
+    # -----------------------------
+    def acquire(self, model: str, tokens: int) -> None:
+        """Block the calling thread until the request may be sent"""
+        if model not in self._buckets:
+            return
+        admitted = threading.Event()
+        self._enqueue(_Waiter(model, tokens, _priority.get(), admitted.set))
+        admitted.wait()
+
+    async def aacquire(self, model: str, tokens: int) -> None:
+        """Async version of acquire; waits without holding a thread"""
+        if model not in self._buckets:
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve():
+            if future.cancelled():
+                # caller gave up after being admitted; return its budget
+                self.settle(model, tokens, 0, refund_request=True)
+            else:
+                future.set_result(None)
+
+        waiter = _Waiter(
+            model, tokens, _priority.get(), lambda: loop.call_soon_threadsafe(resolve)
+        )
+        self._enqueue(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._cond:
+                waiter.cancelled = True
+            raise
+
+    def settle(
+        self, model: str, estimated: int, actual: int, refund_request: bool = False
+    ) -> None:
+        """Correct the token bucket once the real usage is known"""
+        if model not in self._buckets:
+            return
+        requests_bucket, tokens_bucket = self._buckets[model]
+        with self._cond:
+            now = time.monotonic()
+            requests_bucket._refill(now)
+            tokens_bucket._refill(now)
+            if actual < estimated:
+                tokens_bucket.give(estimated - actual)
+            else:
+                tokens_bucket.take(actual - estimated)
+            if refund_request:
+                requests_bucket.give(1)
+            self._cond.notify()
+
+    def record_rate_limited(self, retrying: bool) -> None:
+        with self._cond:
+            self._rate_limited += 1
+            if retrying:
+                self._retries += 1
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        with self._cond:
+            queue = self._queues.setdefault(waiter.model, [])
+            heapq.heappush(queue, (waiter.priority, next(self._seq), waiter))
+            # (re)start the dispatcher, also if it ever died
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop, name="llm-scheduler", daemon=True
+                )
+                self._dispatcher.start()
+            self._cond.notify()
+
+    def _dispatch_loop(self) -> None:
+        with self._cond:
+            while True:
+                try:
+                    wait = self._admit_ready()
+                except Exception as e:
+                    # a dead dispatcher would leave every caller waiting forever
+                    print(f"[LLM Scheduler] Dispatcher error: {e}")
+                    wait = 1.0
+                self._cond.wait(timeout=wait)
+
+    def _admit_ready(self) -> Optional[float]:
+        """Admit every queue head that fits; return seconds until the next may"""
+        next_wait = None
+        now = time.monotonic()
+        for model, queue in self._queues.items():
+            requests_bucket, tokens_bucket = self._buckets[model]
+            while queue:
+                waiter = queue[0][2]
+                if waiter.cancelled:
+                    heapq.heappop(queue)
+                    continue
+                wait = max(
+                    requests_bucket.time_until(1, now),
+                    tokens_bucket.time_until(waiter.tokens, now),
+                )
+                if wait > 0:
+                    next_wait = wait if next_wait is None else min(next_wait, wait)
+                    break
+                heapq.heappop(queue)
+                requests_bucket.take(1)
+                tokens_bucket.take(waiter.tokens)
+                try:
+                    waiter.grant()
+                except Exception as e:
+                    # e.g. the async caller's event loop is already closed
+                    print(f"[LLM Scheduler] Dropping waiter for {model}: {e}")
+                    waiter.cancelled = True
+                    requests_bucket.give(1)
+                    tokens_bucket.give(waiter.tokens)
+                    continue
+                self._record_wait(waiter, now)
+        return next_wait
+
+    def _record_wait(self, waiter: _Waiter, now: float) -> None:
+        waited = now - waiter.enqueued_at
+        stats = self._stats[PRIORITY_NAMES.get(waiter.priority, "background")]
+        stats["admitted"] += 1
+        stats["wait_seconds_total"] += waited
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for queue in self._queues.values():
+                for priority, _, waiter in queue:
+                    if not waiter.cancelled:
+                        depth[PRIORITY_NAMES.get(priority, "background")] += 1
+            by_priority = {}
+            for name, s in self._stats.items():
+                by_priority[name] = {
+                    "queue_depth": depth[name],
+                    "admitted": s["admitted"],
+                    "wait_seconds_avg": (
+                        round(s["wait_seconds_total"] / s["admitted"], 4)
+                        if s["admitted"]
+                        else 0.0
+                    ),
+                    "wait_seconds_max": round(s["wait_seconds_max"], 4),
+                }
+            return {
+                "priorities": by_priority,
+                "rate_limited_responses": self._rate_limited,
+                "retries": self._retries,
+            }
+
+
+llm_scheduler = LLMScheduler(LLM_RATE_LIMITS)
+
+
+# -----------------------------
+# httpx transports
+# -----------------------------
+def _request_cost(request: httpx.Request) -> Tuple[Optional[str], int, bool]:
+    """(model, estimated tokens, is_streaming) for an OpenAI API request"""
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        return None, 0, False
+    if not isinstance(body, dict):
+        return None, 0, False
+    completion = (
+        body.get("max_completion_tokens")
+        or body.get("max_tokens")
+        or DEFAULT_COMPLETION_TOKENS
+    )
+    # ~4 bytes per token is close enough for admission; settle() corrects it
+    tokens = len(request.content) // 4 + completion
+    return body.get("model"), tokens, bool(body.get("stream"))
+
+
+def _usage_tokens(response: httpx.Response) -> Optional[int]:
+    try:
+        usage = response.json().get("usage") or {}
+        return usage.get("total_tokens")
+    except Exception:
+        return None
+
+
+def _note_sdk_retry(request: httpx.Request) -> None:
+    # the OpenAI SDK numbers its own retries (connection errors, 5xx)
+    if request.headers.get("x-stainless-retry-count", "0") != "0":
+        note_retry()
+
+
+def _final_rate_limit(response: httpx.Response) -> None:
+    # 429s are retried here only: stop the SDK from retrying them again on
+    # top (it honours x-should-retry), which would multiply the sends
+    if response.status_code == 429:
+        response.headers["x-should-retry"] = "false"
+
+
+def _backoff_seconds(attempt: int, response: httpx.Response) -> float:
+    """Full-jitter exponential backoff, never shorter than Retry-After"""
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+    delay = random.uniform(0, ceiling)
+    try:
+        delay = max(delay, float(response.headers.get("retry-after", 0)))
+    except ValueError:
+        pass
+    return delay
+
+
+class SchedulingTransport(httpx.BaseTransport):
+    """
+    Wraps an httpx transport so every OpenAI request waits for its model's
+    budget, 429s are retried with jittered backoff (this is the only layer
+    that retries them), and the token bucket is corrected with the real usage.
+    """
+
+    def __init__(
+        self, transport: httpx.BaseTransport, scheduler: LLMScheduler = llm_scheduler
+    ):
+        self._transport = transport
+        self._scheduler = scheduler
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        _note_sdk_retry(request)
+        model, tokens, streaming = _request_cost(request)
+        if model is None:
+            return self._transport.handle_request(request)
+
+        for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+            self._scheduler.acquire(model, tokens)
+            response = self._transport.handle_request(request)
+            rate_limited = response.status_code == 429
+            retrying = rate_limited and attempt < LLM_RATE_LIMIT_RETRIES
+            if rate_limited:
+                self._scheduler.record_rate_limited(retrying)
+            if not retrying:
+                break
+            note_retry()
+            response.read()
+            response.close()
+            time.sleep(_backoff_seconds(attempt, response))
+
+        if response.status_code == 200 and not streaming:
+            response.read()
+            actual = _usage_tokens(response)
+            if actual is not None:
+                self._scheduler.settle(model, tokens, actual)
+        _final_rate_limit(response)
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncSchedulingTransport(httpx.AsyncBaseTransport):
+    """Async version of SchedulingTransport"""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        scheduler: LLMScheduler = llm_scheduler,
+    ):
+        self._transport = transport
+        self._scheduler = scheduler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _note_sdk_retry(request)
+        model, tokens, streaming = _request_cost(request)
+        if model is None:
+            return await self._transport.handle_async_request(request)
+
+        for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+            await self._scheduler.aacquire(model, tokens)
+            response = await self._transport.handle_async_request(request)
+            rate_limited = response.status_code == 429
+            retrying = rate_limited and attempt < LLM_RATE_LIMIT_RETRIES
+            if rate_limited:
+                self._scheduler.record_rate_limited(retrying)
+            if not retrying:
+                break
+            note_retry()
+            await response.aread()
+            await response.aclose()
+            await asyncio.sleep(_backoff_seconds(attempt, response))
+
+        if response.status_code == 200 and not streaming:
+            await response.aread()
+            actual = _usage_tokens(response)
+            if actual is not None:
+                self._scheduler.settle(model, tokens, actual)
+        _final_rate_limit(response)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
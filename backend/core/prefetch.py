@@ -0,0 +1,201 @@
+# core/prefetch.py
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+# unclaimed speculative results are dropped after this long
+PREFETCH_TTL_SECONDS = float(os.getenv("PREFETCH_TTL_SECONDS", "300"))
+PREFETCH_MAX_WORKERS = int(os.getenv("PREFETCH_MAX_WORKERS", "4"))
+
+
+class PrefetchStore:
+    """
+    Short-lived store of speculative pipeline runs.
+
+    A route that knows which call the client makes next starts that work
+    with prefetch(); the next request claims it by key and either gets the
+    finished result at once or waits on the run already in flight. Entries
+    are keyed by (kind, user_test_id, attempt) and remember the inputs they
+    were started with, so a request whose inputs changed computes afresh.
+    Each entry is claimed at most once. Prefetched functions shouldn't
+    persist anything themselves: the claiming request saves the result, so
+    a run that is replaced, expires or goes stale leaves nothing behind.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = PREFETCH_TTL_SECONDS,
+        max_workers: int = PREFETCH_MAX_WORKERS,
+        enabled: bool = PREFETCH_ENABLED,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="prefetch"
+        )
+        self._entries: Dict[Hashable, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {
+            "started": 0,
+            "hits": 0,
+            "attached": 0,
+            "misses": 0,
+            "stale": 0,
+            "replaced": 0,
+            "abandoned": 0,
+            "expired": 0,
+            "failed": 0,
+        }
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Async prefetches run on the server loop; call from the startup hook"""
+        self._loop = loop
+
+    # -----------------------------
+    # Speculation
+    # -----------------------------
+    def prefetch(
+        self,
+        key: Hashable,
+        fn: Callable[..., Any],
+        *args,
+        inputs: Any = None,
+        replace: bool = False,
+    ) -> None:
+        """
+        Start fn(*args) in the background unless key is already prefetched
+        with the same inputs. With replace, an existing entry is always
+        dropped and its run cancelled if it hasn't started.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._expire_locked()
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not replace and entry["inputs"] == inputs:
+                    return
+                entry["future"].cancel()
+                self._stats["replaced"] += 1
+                print(f"[Prefetch] Replacing {key}")
+            self._entries[key] = {
+                "future": self._run(fn, *args),
+                "inputs": inputs,
+                "created": time.monotonic(),
+            }
+            self._stats["started"] += 1
+        print(f"[Prefetch] Started {key}")
+
+    def _run(self, fn: Callable[..., Any], *args) -> Future:
+        if asyncio.iscoroutinefunction(fn):
+            if self._loop is not None:
+                return asyncio.run_coroutine_threadsafe(fn(*args), self._loop)
+            return self._executor.submit(asyncio.run, fn(*args))
+        # keep the caller's context (LLM priority, metrics attribution)
+        return self._executor.submit(contextvars.copy_context().run, fn, *args)
+
+    def _expire_locked(self) -> None:
+        now = time.monotonic()
+        for key in [
+            key
+            for key, entry in self._entries.items()
+            if now - entry["created"] > self.ttl_seconds
+        ]:
+            self._entries.pop(key)["future"].cancel()
+            self._stats["expired"] += 1
+
+    # -----------------------------
+    # Claiming
+    # -----------------------------
+    def claim(self, key: Hashable, inputs: Any = None) -> Optional[Future]:
+        """
+        Take the prefetched run for key, or None when there is none or it was
+        started with different inputs.
+        """
+        with self._lock:
+            self._expire_locked()
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry["inputs"] != inputs:
+                self._stats["stale"] += 1
+                print(f"[Prefetch] Inputs changed for {key}, recomputing")
+                return None
+            future = entry["future"]
+            self._stats["hits" if future.done() else "attached"] += 1
+        print(f"[Prefetch] {'Hit' if future.done() else 'Attached to'} {key}")
+        return future
+
+    def result(self, key: Hashable, inputs: Any = None) -> Any:
+        """Result of the prefetched run for key; None if missing or failed"""
+        future = self.claim(key, inputs)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            self._bump("failed")
+            print(f"[Prefetch] Speculative run {key} failed: {e}")
+            return None
+
+    def finished_result(self, key: Hashable, inputs: Any = None) -> Any:
+        """
+        Result of the prefetched run for key only if it has already finished.
+        A run still in flight is dropped (and cancelled if it hasn't started)
+        for a caller that would rather compute afresh than wait on it.
+        """
+        with self._lock:
+            self._expire_locked()
+            entry = self._entries.get(key)
+            if entry is not None and not entry["future"].done():
+                del self._entries[key]
+                entry["future"].cancel()
+                self._stats["abandoned"] += 1
+                print(f"[Prefetch] {key} still running, not waiting on it")
+                return None
+        return self.result(key, inputs)
+
+    async def aresult(self, key: Hashable, inputs: Any = None) -> Any:
+        """Async version of result; waits without blocking the event loop"""
+        future = self.claim(key, inputs)
+        if future is None:
+            return None
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception as e:
+            self._bump("failed")
+            print(f"[Prefetch] Speculative run {key} failed: {e}")
+            return None
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire_locked()
+            claimed = self._stats["hits"] + self._stats["attached"]
+            requests = (
+                claimed
+                + self._stats["misses"]
+                + self._stats["stale"]
+                + self._stats["abandoned"]
+            )
+            return {
+                "enabled": self.enabled,
+                "pending": len(self._entries),
+                **self._stats,
+                "hit_rate": round(claimed / requests, 3) if requests else 0.0,
+            }
+
+
+prefetch_store = PrefetchStore()
@@ -0,0 +1,142 @@
+# core/prompt_budget.py
+
+import json
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import tiktoken
+
+# free-text limits tried in order until a payload fits its token budget
+TEXT_LIMITS = (None, 800, 400, 200, 100)
+TRUNCATION_MARK = "…"
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    return len(_encoding(model).encode(text))
+
+
+def _compact(value: Any, max_text_chars: Optional[int]) -> Any:
+    if isinstance(value, dict):
+        return {
+            k: _compact(v, max_text_chars)
+            for k, v in value.items()
+            if v is not None and v != "" and v != [] and v != {}
+        }
+    if isinstance(value, (list, tuple)):
+        return [_compact(v, max_text_chars) for v in value if v is not None]
+    if isinstance(value, str) and max_text_chars and len(value) > max_text_chars:
+        return value[:max_text_chars].rstrip() + TRUNCATION_MARK
+    return value
+
+
+def compact_json(data: Any, max_text_chars: Optional[int] = None) -> str:
+    """
+    Deterministic, minified JSON for prompts: sorted keys, no whitespace,
+    null/empty values dropped, long strings optionally truncated.
+    """
+    return json.dumps(
+        _compact(data, max_text_chars),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+def _longest_list(value: Any) -> Optional[list]:
+    """Find the longest list anywhere in the payload (the one to trim first)"""
+    best = None
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            if item and (best is None or len(item) > len(best)):
+                best = item
+            stack.extend(item)
+    return best
+
+
+class PromptBudgetError(ValueError):
+    """Raised when a payload can't fit; text is the most-trimmed version"""
+
+    def __init__(self, message: str, text: str):
+        super().__init__(message)
+        self.text = text
+
+
+def fit_to_budget(data: Any, max_tokens: int, model: str = "gpt-4o") -> str:
+    """
+    Serialize data with compact_json within max_tokens.
+    Long free text is truncated first, then items are dropped from the end
+    of the longest list. Raises PromptBudgetError if the payload can't fit.
+    """
+    for limit in TEXT_LIMITS:
+        text = compact_json(data, limit)
+        if count_tokens(text, model) <= max_tokens:
+            return text
+
+    # shortest text limit still too big: drop list items from the end of the
+    # longest list, so the newest entries go first
+    trimmed = json.loads(compact_json(data, TEXT_LIMITS[-1]))
+    text = compact_json(trimmed)
+    while True:
+        longest = _longest_list(trimmed)
+        if not longest:
+            break
+        longest.pop()
+        text = compact_json(trimmed)
+        if count_tokens(text, model) <= max_tokens:
+            return text
+
+    raise PromptBudgetError(f"Prompt data does not fit in {max_tokens} tokens", text)
+
+
+# -----------------------------
+# Per-call token accounting
+# -----------------------------
+class PromptTokenStats:
+    """
+    Records input tokens per prompt name, next to what the previous
+    repr-based serialization would have cost, so the savings are visible.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, name: str, sent_tokens: int, baseline_tokens: int) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                name, {"calls": 0, "sent_tokens": 0, "baseline_tokens": 0}
+            )
+            stats["calls"] += 1
+            stats["sent_tokens"] += sent_tokens
+            stats["baseline_tokens"] += baseline_tokens
+        print(
+            f"[Prompt Budget] {name}: {sent_tokens} tokens "
+            f"(repr baseline {baseline_tokens})"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            result = {name: dict(s) for name, s in self._stats.items()}
+        for s in result.values():
+            baseline = s["baseline_tokens"]
+            s["saved_ratio"] = (
+                round(1 - s["sent_tokens"] / baseline, 4) if baseline else 0.0
+            )
+        return result
+
+
+prompt_token_stats = PromptTokenStats()
@@ -1,6 +1,18 @@
+import asyncio
+
 from fastapi import FastAPI
-from routes import assessment_routes, user_routes
+from fastapi.responses import PlainTextResponse
+from routes import assessment_routes, job_routes, user_routes
 from core.model_loader import initialize_ai_models, is_initialized
+from services.embedding_service import enrichment_cache
+from core.llm_cache import llm_response_cache
+from core.prompt_budget import prompt_token_stats
+from core.llm_gateway import llm_gateway
+from core.llm_scheduler import llm_scheduler
+from core.llm_metrics import llm_metrics
+from core.job_queue import job_queue
+from core.prefetch import prefetch_store
+from services.question_bank import question_bank
 
 # Create FastAPI app
 app = FastAPI(title="CodeMap API")
@@ -15,14 +27,89 @@ async def health_check():
         return {"status": "starting", "message": "Server is initializing"}
 
 
+# Enrichment cache hit-rate metrics
+@app.get("/metrics/enrichment-cache")
+async def enrichment_cache_metrics():
+    return enrichment_cache.stats()
+
+
+# LLM response cache hit-rate metrics
+@app.get("/metrics/llm-cache")
+async def llm_cache_metrics():
+    return llm_response_cache.stats()
+
+
+# Prompt input tokens per call site vs. the old repr serialization
+@app.get("/metrics/prompt-tokens")
+async def prompt_token_metrics():
+    return prompt_token_stats.stats()
+
+
+# Calls and token usage per model through the LLM gateway
+@app.get("/metrics/llm-usage")
+async def llm_usage_metrics():
+    return llm_gateway.stats()
+
+
+# LLM scheduler queue depth and wait time per priority
+@app.get("/metrics/llm-scheduler")
+async def llm_scheduler_metrics():
+    return llm_scheduler.stats()
+
+
+# Per-call LLM latency, token, retry and cost metrics (Prometheus text format)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(
+        llm_metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+# Background job queue: workers and job counts by status
+@app.get("/metrics/job-queue")
+async def job_queue_metrics():
+    return job_queue.stats()
+
+
+# Question bank: size, slots filled from the bank and hit rate per category
+@app.get("/metrics/question-bank")
+async def question_bank_metrics():
+    return question_bank.stats()
+
+
+# Speculative prefetch: runs started, claimed (hit/attached) and wasted
+@app.get("/metrics/prefetch")
+async def prefetch_metrics():
+    return prefetch_store.stats()
+
+
+# Claude sidecar circuit breaker: state, failures and fast-failed calls
+@app.get("/metrics/claude-sidecar")
+async def claude_sidecar_metrics():
+    return llm_gateway.claude_breaker.stats()
+
+
+# LLM usage attributed to one user_test_id pipeline run
+@app.get("/metrics/runs/{user_test_id}")
+async def pipeline_run_metrics(user_test_id: str):
+    return llm_metrics.run_summary(user_test_id) or {
+        "error": f"No LLM calls recorded for {user_test_id}"
+    }
+
+
 # Run initialization when FastAPI starts
 @app.on_event("startup")
 async def on_startup():
     # Initialize AI models and load job data
     initialize_ai_models()  # This will load everything
+    # async job handlers and prefetches run on this loop
+    job_queue.start(asyncio.get_running_loop())
+    prefetch_store.start(asyncio.get_running_loop())
     print("✓ Server startup complete - Ready for requests!")
 
 
 # Register routers
 app.include_router(assessment_routes.router)
 app.include_router(user_routes.router)
+app.include_router(job_routes.router)
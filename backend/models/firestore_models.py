@@ -3,6 +3,43 @@ from google.cloud import firestore
 from google.cloud.firestore_v1 import FieldFilter
 
 
+# Firestore commits at most 500 writes per batch
+FIRESTORE_BATCH_LIMIT = 500
+
+
+# -----------------------
+# Batched writes
+# -----------------------
+def _set_batched(writes: list[tuple]) -> list[dict]:
+    """
+    Set each (document ref, data) pair, one WriteBatch commit per 500 writes.
+    Document ids are allocated client-side, so they are known up front.
+    Returns {"id", "error"} per write, in input order; a failed commit marks
+    every write in its batch as failed.
+    """
+    results = []
+    for start in range(0, len(writes), FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        staged = []
+        for doc_ref, data in writes[start : start + FIRESTORE_BATCH_LIMIT]:
+            result = {"id": doc_ref.id, "error": None}
+            try:
+                batch.set(doc_ref, data)
+                staged.append(result)
+            except Exception as e:
+                # e.g. a value Firestore can't encode; only this write is skipped
+                result["error"] = str(e)
+            results.append(result)
+
+        if staged:
+            try:
+                batch.commit()
+            except Exception as e:
+                for result in staged:
+                    result["error"] = f"Batch commit failed: {e}"
+    return results
+
+
 # -----------------------
 # UserTest
 # -----------------------
@@ -31,6 +68,33 @@ def get_user_test(user_id: str) -> dict:
 # -----------------------
 # GeneratedQuestion
 # -----------------------
+def _generated_question_doc(
+    user_id: str,
+    question_text: str,
+    code=None,
+    language=None,
+    options=None,
+    answer=None,
+    difficulty=None,
+    question_type=None,
+    test_attempt=None,
+    bank_id=None,
+) -> dict:
+    return {
+        "user_test_id": user_id,
+        "question_text": question_text,
+        "code": code,
+        "language": language,
+        "options": options or [],
+        "answer": answer,
+        "difficulty": difficulty,
+        "question_type": question_type,
+        "test_attempt": test_attempt,
+        "bank_id": bank_id,
+        "created_at": firestore.SERVER_TIMESTAMP,
+    }
+
+
 def add_generated_question(
     user_id: str,
     question_text: str,
@@ -41,6 +105,7 @@ def add_generated_question(
     difficulty=None,
     question_type=None,
     test_attempt=None,
+    bank_id=None,
 ) -> str:
     print(
         f"[DEBUG] Saving question with test_attempt={test_attempt} for user={user_id}"
@@ -49,22 +114,38 @@ def add_generated_question(
 
     question_ref = db.collection("generated_questions").document()
     question_ref.set(
-        {
-            "user_test_id": user_id,
-            "question_text": question_text,
-            "code": code,
-            "language": language,
-            "options": options or [],
-            "answer": answer,
-            "difficulty": difficulty,
-            "question_type": question_type,
-            "test_attempt": test_attempt,
-            "created_at": firestore.SERVER_TIMESTAMP,
-        }
+        _generated_question_doc(
+            user_id,
+            question_text,
+            code=code,
+            language=language,
+            options=options,
+            answer=answer,
+            difficulty=difficulty,
+            question_type=question_type,
+            test_attempt=test_attempt,
+            bank_id=bank_id,
+        )
     )
     return question_ref.id
 
 
+def add_generated_questions(user_id: str, questions: list[dict]) -> list[dict]:
+    """
+    Save many generated questions in batched writes.
+    Each item takes the keyword arguments of add_generated_question.
+    Returns {"id", "error"} per question, in input order.
+    """
+    print(f"[DEBUG] Saving {len(questions)} questions for user={user_id}")
+    collection = db.collection("generated_questions")
+    return _set_batched(
+        [
+            (collection.document(), _generated_question_doc(user_id, **question))
+            for question in questions
+        ]
+    )
+
+
 def get_generated_questions(user_id: str, attempt_number: int = 1):
     return [
         {**q.to_dict(), "id": q.id}
@@ -77,6 +158,25 @@ def get_generated_questions(user_id: str, attempt_number: int = 1):
     ]
 
 
+def get_served_bank_ids(user_test_ids: list[str]) -> set[str]:
+    """
+    Question bank ids already served to any of the given user tests.
+    """
+    bank_ids = set()
+    # Firestore "in" filters take at most 30 values
+    for start in range(0, len(user_test_ids), 30):
+        chunk = user_test_ids[start : start + 30]
+        for doc in (
+            db.collection("generated_questions")
+            .where(filter=FieldFilter("user_test_id", "in", chunk))
+            .stream()
+        ):
+            bank_id = doc.to_dict().get("bank_id")
+            if bank_id:
+                bank_ids.add(bank_id)
+    return bank_ids
+
+
 # -----------------------
 # FollowUpAnswers
 # -----------------------
@@ -98,6 +198,29 @@ def add_follow_up_answer(
     return answer_ref.id
 
 
+def add_follow_up_answers(answers: list[dict]) -> list[dict]:
+    """
+    Save many follow-up answers in batched writes.
+    Each item takes the keyword arguments of add_follow_up_answer.
+    Returns {"id", "error"} per answer, in input order.
+    """
+    collection = db.collection("follow_up_answers")
+    return _set_batched(
+        [
+            (
+                collection.document(),
+                {
+                    "user_test_id": answer["user_id"],
+                    "question_id": answer["question_id"],
+                    "selected_option": answer["selected_option"],
+                    "test_attempt": answer["attempt_number"],
+                },
+            )
+            for answer in answers
+        ]
+    )
+
+
 def get_follow_up_answers_by_user(user_id: str, attempt_number: int):
     return [
         doc.to_dict()
@@ -1,21 +1,28 @@
 # acts as the API endpoint. It receives requests from Dart, performs the computation or data retrieval, and returns a response.
 
-from fastapi import APIRouter, Body, Query
+import asyncio
+import json
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, BackgroundTasks, Body, Query
+from fastapi.responses import StreamingResponse
 from schemas.assessment import (
     FollowUpResponses,
     JobMatch,
     UserProfileMatchResponse,
     UserResponses,
 )
-from services.questions_generation_service import generate_questions
+from services.questions_generation_service import generate_questions, stream_questions
 from services.charts_generation_service import (
     compute_and_save_charts_for_all_jobs,
 )
 from services.embedding_service import (
-    create_user_embedding,
-    match_user_to_job,
-    analyze_user_skills_knowledge,
+    acreate_user_embedding,
+    aiter_job_matches,
+    amatch_user_to_job,
+    aanalyze_user_skills_knowledge,
 )
+from services.pipeline_context import PipelineContext
 from services.gap_analysis_service import (
     compute_gap_for_single_job,
     compute_gaps_for_jobs,
@@ -24,9 +31,11 @@ from services.report_generation_service import get_report_data
 from models.firestore_models import (
     create_user_test,
     add_user_skills_knowledge,
-    add_generated_question,
+    add_generated_questions,
+    add_follow_up_answers,
     get_all_jobs,
     get_generated_questions,
+    get_served_bank_ids,
     add_career_recommendation,
     add_job_match,
     get_job_matches,
@@ -38,6 +47,9 @@ from services.career_roadmaps_service import (
     retrieve_career_roadmap,
 )
 from core.database import db  # Firestore client
+from core.llm_metrics import llm_metrics, pipeline_run
+from core.pipeline_dag import PipelineDAG
+from core.prefetch import prefetch_store
 
 router = APIRouter()
 
@@ -46,7 +58,7 @@ router = APIRouter()
 # Submit user test responses
 # -----------------------------
 @router.post("/submit-test")
-def submit_test(data: UserResponses):
+def submit_test(data: UserResponses, background_tasks: BackgroundTasks):
     doc_data = {
         "educationLevel": data.educationLevel,
         "cgpa": data.cgpa,
@@ -61,14 +73,16 @@ def submit_test(data: UserResponses):
     }
     user_test_id = create_user_test(doc_data, data.userTestId)
     add_user_skills_knowledge(user_test_id, skills=[], knowledge=[])
+    # the client calls /generate-questions next; start it after responding
+    background_tasks.add_task(_prefetch_follow_up_questions, user_test_id)
     return {"message": "Data saved successfully", "id": user_test_id}
 
 
 # -----------------------------
 # Generate follow-up questions
 # -----------------------------
-@router.post("/generate-questions")
-def create_follow_up_questions(user_test_id: str = Body(..., embed=True)):
+def _question_request(user_test_id: str) -> dict:
+    """Attempt number and reflection inputs for question generation"""
     # get the user test document
     user_ref = db.collection("user_tests").document(user_test_id).get()
     print(f"Checked user_tests/{user_test_id} - exists: {user_ref.exists}")
@@ -109,48 +123,199 @@ def create_follow_up_questions(user_test_id: str = Body(..., embed=True)):
     if not skill_reflection and not thesis_findings and not career_goals:
         return {"error": "Insufficient data to generate questions"}
 
+    return {
+        "attempt_number": attempt_number,
+        "test_ids": user_data.get("testIds", [user_test_id]),
+        "inputs": {
+            "skill_reflection": skill_reflection,
+            "thesis_findings": thesis_findings,
+            "career_goals": career_goals,
+        },
+    }
+
+
+def _question_fields(q: dict, attempt_number: int) -> dict:
+    """add_generated_question arguments for a generated MCQ"""
+    return {
+        "question_text": q.get("question", ""),
+        "code": q.get("code", None),
+        "language": q.get("language", None),
+        "options": q.get("options", []),
+        "answer": q.get("answer", ""),
+        "difficulty": q.get("difficulty", "easy"),
+        "question_type": q.get("category", "general"),
+        "test_attempt": attempt_number,  # use attempt_number from assessmentAttempts
+        "bank_id": q.get("bank_id"),
+    }
+
+
+def _saved_question(question_id: str, q: dict, attempt_number: int) -> dict:
+    return {
+        "id": question_id,
+        "question": q.get("question", ""),
+        "code": q.get("code", None),
+        "language": q.get("language", None),
+        "options": q.get("options", []),
+        "answer": q.get("answer", ""),
+        "difficulty": q.get("difficulty", "easy"),
+        "category": q.get("category", "general"),
+        "test_attempt": attempt_number,
+    }
+
+
+def _generate_follow_up_questions(user_test_id: str, request: dict) -> list:
+    """Generated MCQs for the request, not yet saved"""
+    # bank questions from any of this user's attempts are not repeated
+    served_bank_ids = get_served_bank_ids(request["test_ids"])
+
     # pass all three into service (allowing service to handle None/empty)
-    result = generate_questions(
-        skill_reflection=skill_reflection,
-        thesis_findings=thesis_findings,
-        career_goals=career_goals,
+    with pipeline_run(user_test_id):
+        result = generate_questions(
+            **request["inputs"], exclude_bank_ids=served_bank_ids
+        )
+    return result.get("questions", [])
+
+
+def _save_question_batch(
+    user_test_id: str, raw_questions: list, attempt_number: int
+) -> list:
+    """Save MCQs in one batched write; those that failed are logged and left out"""
+    results = add_generated_questions(
+        user_test_id, [_question_fields(q, attempt_number) for q in raw_questions]
     )
-    raw_questions = result.get("questions", [])
 
     saved_questions = []
-    for q in raw_questions:
-        try:
-            question_id = add_generated_question(
-                user_id=user_test_id,
-                question_text=q.get("question", ""),
-                code=q.get("code", None),
-                language=q.get("language", None),
-                options=q.get("options", []),
-                answer=q.get("answer", ""),
-                difficulty=q.get("difficulty", "easy"),
-                question_type=q.get("category", "general"),
-                test_attempt=attempt_number,  # use attempt_number from assessmentAttempts
-            )
-            saved_questions.append(
-                {
-                    "id": question_id,
-                    "question": q.get("question", ""),
-                    "code": q.get("code", None),
-                    "language": q.get("language", None),
-                    "options": q.get("options", []),
-                    "answer": q.get("answer", ""),
-                    "difficulty": q.get("difficulty", "easy"),
-                    "category": q.get("category", "general"),
-                    "test_attempt": attempt_number,
-                }
-            )
-        except Exception as e:
-            print(f"[ERROR] Failed to save question: {str(e)}")
+    for q, result in zip(raw_questions, results):
+        if result["error"]:
+            print(f"[ERROR] Failed to save question: {result['error']}")
+            continue
+        saved_questions.append(_saved_question(result["id"], q, attempt_number))
+    return saved_questions
+
 
+def _save_questions(user_test_id: str, raw_questions: list, attempt_number: int):
+    # one batched write for all questions instead of a round-trip each
+    saved_questions = _save_question_batch(user_test_id, raw_questions, attempt_number)
     print(f"=== DEBUG END: Generated {len(saved_questions)} questions ===")
     return {"questions": saved_questions}
 
 
+def _generate_and_save_questions(user_test_id: str, request: dict) -> dict:
+    raw_questions = _generate_follow_up_questions(user_test_id, request)
+    return _save_questions(user_test_id, raw_questions, request["attempt_number"])
+
+
+def _prefetch_follow_up_questions(user_test_id: str):
+    """Start question generation for a just-submitted test in the background"""
+    try:
+        request = _question_request(user_test_id)
+    except Exception as e:
+        # e.g. the user doc doesn't list this test yet
+        print(f"[Prefetch] Skipping questions for {user_test_id}: {str(e)}")
+        return
+    if "error" in request:
+        return
+    # only generated here; saved by whichever request claims it, so an
+    # abandoned or stale run leaves nothing behind in Firestore
+    prefetch_store.prefetch(
+        ("generate_questions", user_test_id, request["attempt_number"]),
+        _generate_follow_up_questions,
+        user_test_id,
+        request,
+        inputs=request["inputs"],
+    )
+
+
+@router.post("/generate-questions")
+def create_follow_up_questions(user_test_id: str = Body(..., embed=True)):
+    request = _question_request(user_test_id)
+    if "error" in request:
+        return request
+
+    # /submit-test usually started this already; reuse or wait for that run
+    prefetched = prefetch_store.result(
+        ("generate_questions", user_test_id, request["attempt_number"]),
+        inputs=request["inputs"],
+    )
+    # an empty set means the speculative generation failed; try again
+    if prefetched:
+        return _save_questions(user_test_id, prefetched, request["attempt_number"])
+
+    return _generate_and_save_questions(user_test_id, request)
+
+
+@router.post("/generate-questions/stream")
+async def create_follow_up_questions_stream(user_test_id: str = Body(..., embed=True)):
+    """
+    Server-sent-events variant of /generate-questions.
+    Emits one `question` event per MCQ as soon as it is validated and saved,
+    then `complete`. Failures are sent as an `error` event.
+    """
+
+    async def events():
+        request = await asyncio.to_thread(_question_request, user_test_id)
+        if "error" in request:
+            yield _sse("error", request)
+            return
+        attempt_number = request["attempt_number"]
+
+        # a finished speculative run from /submit-test is saved and replayed;
+        # waiting on one still in flight would hold back every event until it
+        # is done, so that case streams a fresh set instead
+        prefetched = prefetch_store.finished_result(
+            ("generate_questions", user_test_id, attempt_number),
+            inputs=request["inputs"],
+        )
+        if prefetched:
+            saved = await asyncio.to_thread(
+                _save_questions, user_test_id, prefetched, attempt_number
+            )
+            for question in saved["questions"]:
+                yield _sse("question", question)
+            yield _sse("complete", {"question_count": len(saved["questions"])})
+            return
+
+        served_bank_ids = await asyncio.to_thread(
+            get_served_bank_ids, request["test_ids"]
+        )
+        saved = 0
+        with pipeline_run(user_test_id):
+            questions = stream_questions(
+                **request["inputs"], exclude_bank_ids=served_bank_ids
+            )
+            try:
+                while True:
+                    batch = await asyncio.to_thread(next, questions, None)
+                    if batch is None:
+                        break
+                    # each validated chunk is saved in one batched write
+                    for question in await asyncio.to_thread(
+                        _save_question_batch, user_test_id, batch, attempt_number
+                    ):
+                        saved += 1
+                        yield _sse("question", question)
+            except Exception as e:
+                print(f"[ERROR] Streaming questions failed: {str(e)}")
+                yield _sse("error", {"error": f"Question generation failed: {str(e)}"})
+                return
+            finally:
+                # stops generation when the client disconnects
+                try:
+                    questions.close()
+                except ValueError:
+                    # still running in a worker thread; it stops on its own
+                    pass
+
+        print(f"=== DEBUG END: Streamed {saved} questions ===")
+        yield _sse("complete", {"question_count": saved})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # -----------------------------
 # Retrieve generated follow-up questions
 # -----------------------------
@@ -174,59 +339,207 @@ def get_all_generated_questions(request: dict):
 # -----------------------------
 @router.post("/submit-follow-up")
 def submit_follow_up(data: FollowUpResponses):
-    for resp in data.responses:
-        try:
-            db.collection("follow_up_answers").document().set(
-                {
-                    "user_test_id": resp.user_test_id,
-                    "question_id": resp.questionId,
-                    "selected_option": resp.selectedOption,
-                    "test_attempt": resp.test_attempt,
-                }
-            )
-        except Exception as e:
-            print(f"[ERROR] Failed to save follow-up answer: {str(e)}")
+    # one batched write for all answers instead of a round-trip each
+    results = add_follow_up_answers(
+        [
+            {
+                "user_id": resp.user_test_id,
+                "question_id": resp.questionId,
+                "selected_option": resp.selectedOption,
+                "attempt_number": resp.test_attempt,
+            }
+            for resp in data.responses
+        ]
+    )
+    for result in results:
+        if result["error"]:
+            print(f"[ERROR] Failed to save follow-up answer: {result['error']}")
+
+    # the client calls /user-profile-match next; start it now
+    for user_test_id, attempt in {
+        (resp.user_test_id, resp.test_attempt) for resp in data.responses
+    }:
+        # resubmitted answers make any earlier speculative run stale
+        prefetch_store.prefetch(
+            ("user_profile_match", user_test_id, attempt),
+            _prefetch_user_profile_match,
+            user_test_id,
+            replace=True,
+        )
     return {"message": "Follow-up answers saved successfully"}
 
 
 # -----------------------------
 # Generate user profile and job matches
 # -----------------------------
+def _save_profile_match(user_test_id: str, profile_text: str, job_matches: list):
+    """Save the career recommendation and its job matches into Firestore"""
+    try:
+        rec_id = add_career_recommendation(user_test_id, profile_text=profile_text)
+        print(f"SUCCESS: Created career recommendation ID: {rec_id}")
+
+        for job in job_matches:
+            add_job_match(
+                recommendation_id=rec_id,
+                job_id=str(job.get("job_index", "")),
+                job_title=job.get("job_title", ""),
+                job_description=job.get("job_description", ""),
+                similarity_score=job.get("similarity_score", 0.0),
+                similarity_percentage=job.get("similarity_percentage", 0.0),
+                required_skills=job.get("required_skills", {}),
+                required_knowledge=job.get("required_knowledge", {}),
+            )
+            print(f"SUCCESS: Saved {len(job_matches)} job matches")
+    except Exception as e:
+        print(f"[ERROR] Failed to save career recommendation/job matches: {str(e)}")
+
+
+async def _analyze_skills(
+    user_test_id: str, context: PipelineContext, save: bool = True
+):
+    """
+    Run the skills/knowledge analysis, saving it unless save is False;
+    failures are only logged
+    """
+    try:
+        result = await aanalyze_user_skills_knowledge(user_test_id, context, save)
+        if result and "error" not in result:
+            if save:
+                print(f"[INFO] Skills/Knowledge saved for user_test_id {user_test_id}")
+            print(f"Extracted skills: {result.get('skills', [])}")
+            print(f"Extracted knowledge: {result.get('knowledge', [])}")
+        return result
+    except Exception as e:
+        print(f"[ERROR] Skills/Knowledge analysis failed: {str(e)}")
+        return None
+
+
+def _to_job_match(job: dict) -> JobMatch:
+    return JobMatch(
+        job_index=str(job.get("job_index", "")),
+        job_title=job.get("job_title", ""),
+        job_description=job.get("job_description", ""),
+        similarity_score=job.get("similarity_score", 0.0),
+        similarity_percentage=job.get("similarity_percentage", 0.0),
+        required_skills=job.get("required_skills", {}),
+        required_knowledge=job.get("required_knowledge", {}),
+    )
+
+
 @router.post(
     "/user-profile-match", response_model=UserProfileMatchResponse
 )  # ensures the API response follows this schema and filters extra fields
-def user_profile_match(user_test_id: str = Body(..., embed=True)):
-    user_ref = db.collection("user_tests").document(user_test_id).get()
+async def user_profile_match(user_test_id: str = Body(..., embed=True)):
+    # async handler: LLM calls await the AsyncOpenAI client instead of holding
+    # a threadpool thread; blocking Firestore/model work runs via to_thread
+    user_ref = await asyncio.to_thread(
+        db.collection("user_tests").document(user_test_id).get
+    )
     if not user_ref.exists:
         print(f"ERROR: User test not found")
-        return UserProfileMatchResponse(
-            profile_text="",
-            job_matches=[],
-            error=f"User test ID {user_test_id} not found",
+        return _user_test_not_found(user_test_id)
+
+    # every stage reads the same user data, so load each piece once per request
+    context = PipelineContext(user_test_id, user_test_doc=user_ref.to_dict())
+
+    # /submit-follow-up usually started this already; reuse or wait for that run
+    attempt = await asyncio.to_thread(context.latest_attempt)
+    prefetched = await prefetch_store.aresult(
+        ("user_profile_match", user_test_id, attempt)
+    )
+    if prefetched is not None:
+        response, skills = prefetched
+        if not response.error:
+            # the speculative run saves nothing itself; do it now it's claimed
+            await asyncio.to_thread(
+                _save_prefetched_profile_match, user_test_id, response, skills
+            )
+            return response
+
+    response, _ = await _run_user_profile_match(user_test_id, context)
+    return response
+
+
+def _user_test_not_found(user_test_id: str) -> UserProfileMatchResponse:
+    return UserProfileMatchResponse(
+        profile_text="",
+        job_matches=[],
+        error=f"User test ID {user_test_id} not found",
+    )
+
+
+async def _prefetch_user_profile_match(user_test_id: str):
+    """
+    Speculative /user-profile-match run started by /submit-follow-up.
+    Returns (response, skills analysis); nothing is saved until
+    /user-profile-match claims it.
+    """
+    user_ref = await asyncio.to_thread(
+        db.collection("user_tests").document(user_test_id).get
+    )
+    if not user_ref.exists:
+        return _user_test_not_found(user_test_id), None
+    context = PipelineContext(user_test_id, user_test_doc=user_ref.to_dict())
+    return await _run_user_profile_match(user_test_id, context, save=False)
+
+
+def _save_prefetched_profile_match(
+    user_test_id: str, response: UserProfileMatchResponse, skills: Optional[dict]
+):
+    """Save what a claimed speculative run would have saved itself"""
+    if skills and "error" not in skills:
+        add_user_skills_knowledge(
+            user_test_id=user_test_id,
+            skills=skills.get("skills", {}),
+            knowledge=skills.get("knowledge", {}),
+        )
+        print(f"[INFO] Skills/Knowledge saved for user_test_id {user_test_id}")
+    if response.job_matches:
+        _save_profile_match(
+            user_test_id,
+            response.profile_text,
+            [job.model_dump() for job in response.job_matches],
         )
 
-    user_data = create_user_embedding(user_test_id)
+
+async def _run_user_profile_match(
+    user_test_id: str, context: PipelineContext, save: bool = True
+) -> Tuple[UserProfileMatchResponse, Optional[dict]]:
+    """
+    Profile, job matching and skills analysis for one test, returned as
+    (response, skills analysis). Results are saved to Firestore unless save
+    is False.
+    """
+
+    async def match_jobs(embedding):
+        if not embedding or "error" in embedding:
+            return None
+        return await amatch_user_to_job(user_test_id, embedding.get("user_embedding"))
+
+    pipeline = (
+        PipelineDAG("user_profile_match")
+        .stage("embedding", lambda: acreate_user_embedding(user_test_id, context))
+        # job matching doesn't need the analysis, so it runs alongside it
+        .stage(
+            "skills_analysis", lambda: _analyze_skills(user_test_id, context, save)
+        )
+        .stage("matching", match_jobs, depends_on=["embedding"])
+    )
+    with pipeline_run(user_test_id):
+        results = await pipeline.run()
+    print(f"[INFO] Pipeline data context: {context.stats()}")
+    print(f"[INFO] LLM usage for run: {llm_metrics.run_summary(user_test_id)}")
+
+    skills = results["skills_analysis"]
+    user_data = results["embedding"]
     if not user_data or "error" in user_data:
         return UserProfileMatchResponse(
             profile_text="",
-            jop_matches=[],
+            job_matches=[],
             error=f"User embedding failed: {user_data.get('error', 'Unknown error') if user_data else 'No data returned'}",
-        )
-
-    # analyze skills/knowledge
-    try:
-        skills_knowledge_result = analyze_user_skills_knowledge(user_test_id)
-        if skills_knowledge_result and "error" not in skills_knowledge_result:
-            print(f"[INFO] Skills/Knowledge saved for user_test_id {user_test_id}")
-            print(f"Extracted skills: {skills_knowledge_result.get('skills', [])}")
-            print(
-                f"Extracted knowledge: {skills_knowledge_result.get('knowledge', [])}"
-            )
-    except Exception as e:
-        print(f"[ERROR] Skills/Knowledge analysis failed: {str(e)}")
+        ), skills
 
-    # match jobs
-    matches = match_user_to_job(user_test_id, user_data.get("user_embedding"))
+    matches = results["matching"]
 
     print(f"Matches found: {matches is not None}")
     print(f"Matches has error: {'error' in matches if matches else 'No matches'}")
@@ -238,46 +551,98 @@ def user_profile_match(user_test_id: str = Body(..., embed=True)):
         return UserProfileMatchResponse(
             profile_text=user_data.get("profile_text", ""),
             job_matches=[],
-        )
+        ), skills
 
     # save into Firestore
-    try:
-        rec_id = add_career_recommendation(
-            user_test_id, profile_text=user_data.get("profile_text", "")
+    if save:
+        await asyncio.to_thread(
+            _save_profile_match,
+            user_test_id,
+            user_data.get("profile_text", ""),
+            matches.get("job_matches", []),
         )
-        print(f"SUCCESS: Created career recommendation ID: {rec_id}")
 
-        for job in matches.get("job_matches", []):
-            add_job_match(
-                recommendation_id=rec_id,
-                job_id=str(job.get("job_index", "")),
-                job_title=job.get("job_title", ""),
-                job_description=job.get("job_description", ""),
-                similarity_score=job.get("similarity_score", 0.0),
-                similarity_percentage=job.get("similarity_percentage", 0.0),
-                required_skills=job.get("required_skills", {}),
-                required_knowledge=job.get("required_knowledge", {}),
-            )
-            print(f"SUCCESS: Saved {len(matches.get('job_matches', []))} job matches")
-    except Exception as e:
-        print(f"[ERROR] Failed to save career recommendation/job matches: {str(e)}")
-
-    job_matches_list = [
-        JobMatch(
-            job_index=str(job.get("job_index", "")),
-            job_title=job.get("job_title", ""),
-            job_description=job.get("job_description", ""),
-            similarity_score=job.get("similarity_score", 0.0),
-            similarity_percentage=job.get("similarity_percentage", 0.0),
-            required_skills=job.get("required_skills", {}),
-            required_knowledge=job.get("required_knowledge", {}),
-        )
-        for job in matches.get("job_matches", [])
-    ]
+    job_matches_list = [_to_job_match(job) for job in matches.get("job_matches", [])]
 
     return UserProfileMatchResponse(
         profile_text=user_data.get("profile_text", ""),
         job_matches=job_matches_list,
+    ), skills
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/user-profile-match/stream")
+async def user_profile_match_stream(user_test_id: str = Body(..., embed=True)):
+    """
+    Server-sent-events variant of /user-profile-match.
+    Emits `profile` once the profile text is ready, one `job_match` per job
+    as its enrichment finishes (with its rank), then `complete`.
+    Failures are sent as an `error` event.
+    """
+    user_ref = await asyncio.to_thread(
+        db.collection("user_tests").document(user_test_id).get
+    )
+
+    async def events():
+        if not user_ref.exists:
+            yield _sse("error", {"error": f"User test ID {user_test_id} not found"})
+            return
+
+        with pipeline_run(user_test_id):
+            context = PipelineContext(user_test_id, user_test_doc=user_ref.to_dict())
+            skills_task = asyncio.create_task(_analyze_skills(user_test_id, context))
+            try:
+                user_data = await acreate_user_embedding(user_test_id, context)
+                if not user_data or "error" in user_data:
+                    error = (
+                        user_data.get("error", "Unknown error")
+                        if user_data
+                        else "No data returned"
+                    )
+                    yield _sse("error", {"error": f"User embedding failed: {error}"})
+                    return
+
+                profile_text = user_data.get("profile_text", "")
+                yield _sse("profile", {"profile_text": profile_text})
+
+                ranked = []
+                try:
+                    async for rank, job in aiter_job_matches(
+                        user_test_id, user_data.get("user_embedding")
+                    ):
+                        ranked.append((rank, job))
+                        yield _sse(
+                            "job_match",
+                            {"rank": rank, **_to_job_match(job).model_dump()},
+                        )
+                except Exception as e:
+                    print(f"[ERROR] Streaming job matches failed: {str(e)}")
+                    error = f"Failed to query jobs from Pinecone: {str(e)}"
+                    yield _sse("error", {"error": error})
+                    return
+
+                # same persisted shape as the non-streaming endpoint
+                job_matches = [job for _, job in sorted(ranked, key=lambda x: x[0])]
+                if job_matches:
+                    await asyncio.to_thread(
+                        _save_profile_match, user_test_id, profile_text, job_matches
+                    )
+
+                await skills_task
+                print(f"[INFO] Pipeline data context: {context.stats()}")
+                yield _sse("complete", {"job_count": len(job_matches)})
+            finally:
+                # client disconnects cancel the generator; don't leave work behind
+                if not skills_task.done():
+                    skills_task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -394,7 +759,8 @@ def get_recent_user_test(user_id: str):
 )  # FastAPI automatically extracts user_test_id from the URL and passes it as the function argument.
 def generate_career_roadmaps(user_test_id: str):
     """Retrieve career roadmaps for all jobs."""
-    career_roadmap = compute_career_roadmaps(user_test_id)
+    with pipeline_run(user_test_id):
+        career_roadmap = compute_career_roadmaps(user_test_id)
 
     if "error" in career_roadmap:
         return career_roadmap
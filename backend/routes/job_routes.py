@@ -0,0 +1,72 @@
+# Background-job variants of the long-running assessment endpoints.
+# Submitting returns a job id at once; clients poll /jobs/{job_id} for the result.
+
+from fastapi import APIRouter, Body, HTTPException
+from core.job_queue import job_queue
+from routes.assessment_routes import (
+    create_follow_up_questions,
+    generate_career_roadmaps,
+    user_profile_match,
+)
+
+router = APIRouter()
+
+
+# -----------------------------
+# Job handlers
+# -----------------------------
+# each handler runs the same code as the synchronous endpoint, so results
+# are written to the same Firestore locations
+def _generate_questions_job(payload: dict):
+    return create_follow_up_questions(payload["user_test_id"])
+
+
+async def _user_profile_match_job(payload: dict):
+    response = await user_profile_match(payload["user_test_id"])
+    return response.model_dump()
+
+
+def _career_roadmaps_job(payload: dict):
+    return generate_career_roadmaps(payload["user_test_id"])
+
+
+job_queue.register("generate_questions", _generate_questions_job)
+job_queue.register("user_profile_match", _user_profile_match_job)
+job_queue.register("career_roadmaps", _career_roadmaps_job)
+
+
+def _submit(kind: str, user_test_id: str):
+    # a retried submission attaches to the job already in progress
+    job = job_queue.submit(
+        kind, {"user_test_id": user_test_id}, dedupe_key=user_test_id
+    )
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+
+# -----------------------------
+# Submit jobs
+# -----------------------------
+@router.post("/jobs/generate-questions")
+def submit_generate_questions_job(user_test_id: str = Body(..., embed=True)):
+    return _submit("generate_questions", user_test_id)
+
+
+@router.post("/jobs/user-profile-match")
+def submit_user_profile_match_job(user_test_id: str = Body(..., embed=True)):
+    return _submit("user_profile_match", user_test_id)
+
+
+@router.post("/jobs/career-roadmap-generation/all/{user_test_id}")
+def submit_career_roadmaps_job(user_test_id: str):
+    return _submit("career_roadmaps", user_test_id)
+
+
+# -----------------------------
+# Job status
+# -----------------------------
+@router.get("/jobs/{job_id}")
+def get_job_status(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
@@ -74,6 +74,16 @@ class JobMatch(BaseModel):
     required_knowledge: Dict[str, str]
 
 
+class JobEnrichment(BaseModel):
+    summary: str = Field(description="Career summary, under 400 characters")
+    skills: Dict[str, str] = Field(
+        default_factory=dict, description="Skill -> Basic/Intermediate/Advanced"
+    )
+    knowledge: Dict[str, str] = Field(
+        default_factory=dict, description="Knowledge -> Basic/Intermediate/Advanced"
+    )
+
+
 class UserProfileMatchResponse(BaseModel):
     profile_text: str
     job_matches: List[JobMatch]
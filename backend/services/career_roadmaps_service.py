@@ -2,7 +2,6 @@ import os
 import json
 import re
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from models.firestore_models import (
     get_recommendation_id_by_user_test_id,
     create_career_roadmap,
@@ -10,7 +9,8 @@ from models.firestore_models import (
     get_user_job_skill_matches,
 )
 from core.database import db
-from .claude_agent.claude_wrapper import ClaudeWrapper
+from core.llm_cache import install_langchain_cache
+from core.llm_gateway import llm_gateway
 
 # -----------------------------
 # Load environment variables
@@ -23,8 +23,12 @@ if not OPENAI_API_KEY:
 # -----------------------------
 # Initialize LLM
 # -----------------------------
-llm = ChatOpenAI(model="gpt-4o", temperature=0.2)
-validator_llm = ClaudeWrapper(endpoint_url="http://localhost:5001/chat", temperature=0.1)
+# share the disk-backed response cache with every LangChain model below
+install_langchain_cache()
+
+# pooled clients, timeouts and accounting come from the shared gateway
+llm = llm_gateway.langchain_chat_model(model="gpt-4o", temperature=0.2)
+validator_llm = llm_gateway.claude_llm("chat", temperature=0.1)
 
 
 def generate_roadmap_with_openai(skill_status: dict, knowledge_status: dict) -> dict:
@@ -75,7 +79,9 @@ def generate_roadmap_with_openai(skill_status: dict, knowledge_status: dict) ->
     """
 
     try:
-        response = llm.invoke(prompt)
+        response = llm.invoke(
+            prompt, config={"metadata": {"call_site": "roadmap_draft"}}
+        )
 
         # find JSON in the response
         json_match = re.search(r"\{.*\}", response.content, re.DOTALL)
@@ -131,7 +137,9 @@ def refine_roadmap_with_claude(draft_roadmap: dict, user_context: dict) -> dict:
         # It seems we treat it as a LangChain LLM or similar. 
         # Ideally we just call it. But wait, ClaudeWrapper might expect a prompt string.
         
-        response = validator_llm.invoke(prompt)
+        response = validator_llm.invoke(
+            prompt, config={"metadata": {"call_site": "roadmap_refine"}}
+        )
         
         # Parse JSON from Claude's response (using regex for safety)
         json_match = re.search(r"\{.*\}", response, re.DOTALL)
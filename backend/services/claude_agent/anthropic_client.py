@@ -1,6 +1,7 @@
 import os
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from anthropic import Anthropic
 from dotenv import load_dotenv
@@ -10,7 +11,7 @@ load_dotenv()
 
 # Global client
 _client = None
-_model_name = "claude-opus-4-5-20251101"
+_model_name = os.getenv("CLAUDE_MODEL", "claude-opus-4-5-20251101")
 
 def load_model():
     """
@@ -31,77 +32,107 @@ def load_model():
         return
 
     try:
-        _client = Anthropic(api_key=api_key)
+        # ANTHROPIC_BASE_URL can point at benchmarks/fake_llm_server.py
+        _client = Anthropic(api_key=api_key, base_url=os.getenv("ANTHROPIC_BASE_URL"))
         print("[Claude Agent] Anthropic client initialized successfully.")
     except Exception as e:
         print(f"[Claude Agent ERROR] Failed to initialize Anthropic client: {e}")
         raise e
 
-def validate_with_model(mcqs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+SYSTEM_INSTRUCTION = (
+    "You are an expert Computer Science exam editor. "
+    "Check the provided MCQs for errors in options/answers.\n"
+    "If a question is correct, keep it exactly as is.\n"
+    "If there is an error, FIX IT in the output JSON.\n"
+    "Output ONLY a valid JSON array of the corrected MCQs.\n"
+    "Do not include any explanations or markdown."
+)
+
+# MCQs per validation request; small chunks keep each response short and
+# limit a bad response to the questions in its chunk
+VALIDATION_CHUNK_SIZE = int(os.getenv("CLAUDE_VALIDATION_CHUNK_SIZE", "3"))
+# concurrent validation requests per call
+VALIDATION_MAX_CONCURRENCY = int(os.getenv("CLAUDE_VALIDATION_MAX_CONCURRENCY", "4"))
+MAX_TOKENS_PER_QUESTION = 700
+
+
+def _robust_parse(text):
+    match = re.search(r"(\[.*\])", text, re.DOTALL)
+    if not match:
+        return None
+    candidate = match.group(1)
+    try:
+        return json.loads(candidate)
+    except:
+        return None
+
+
+def _validate_chunk(index: int, mcqs: List[Dict[str, Any]]):
     """
-    Validates MCQs using the Anthropic API.
+    Validate one chunk. Returns (corrected MCQs, ok); on any failure the
+    chunk's original MCQs are returned with ok False.
     """
-    global _client
-    if _client is None:
-        print("[Claude Agent WARNING] Client not initialized, attempting to load now...")
-        load_model()
-        if _client is None:
-             print("[Claude Agent ERROR] Cannot validate, client failed to initialize.")
-             return mcqs
-    
-    print(f"[Claude Agent] Validating {len(mcqs)} questions with {_model_name}...")
-    
-    system_instruction = (
-        "You are an expert Computer Science exam editor. "
-        "Check the provided MCQs for errors in options/answers.\n"
-        "If a question is correct, keep it exactly as is.\n"
-        "If there is an error, FIX IT in the output JSON.\n"
-        "Output ONLY a valid JSON array of the corrected MCQs.\n"
-        "Do not include any explanations or markdown."
-    )
-    
     user_input = f"Here are the MCQs to validate:\n{json.dumps(mcqs, indent=2)}\n\nRespond with the JSON array only."
-    
+
     try:
         message = _client.messages.create(
             model=_model_name,
-            max_tokens=4096,
+            max_tokens=min(4096, MAX_TOKENS_PER_QUESTION * len(mcqs)),
             temperature=0.0,
-            system=system_instruction,
+            system=SYSTEM_INSTRUCTION,
             messages=[
                 {"role": "user", "content": user_input}
             ]
         )
-        
-        content = message.content[0].text
-        
-        # Helper to parse JSON
-        def robust_parse(text):
-            match = re.search(r"(\[.*\])", text, re.DOTALL)
-            if not match:
-                return None
-            candidate = match.group(1)
-            try:
-                return json.loads(candidate)
-            except:
-                return None
-
-        corrected_mcqs = robust_parse(content)
-        
+
+        corrected_mcqs = _robust_parse(message.content[0].text)
+
         if corrected_mcqs and isinstance(corrected_mcqs, list):
             if len(corrected_mcqs) != len(mcqs):
-                print(f"[Claude Agent WARNING] API returned {len(corrected_mcqs)} questions, expected {len(mcqs)}. Discarding changes.")
-                return mcqs
-                
-            print(f"[Claude Agent] Claude API returned {len(corrected_mcqs)} validated questions.")
-            return corrected_mcqs
-        else:
-            print("[Claude Agent ERROR] Could not find valid JSON array in API response.")
-            return mcqs
+                print(f"[Claude Agent WARNING] Chunk {index}: API returned {len(corrected_mcqs)} questions, expected {len(mcqs)}. Discarding changes.")
+                return mcqs, False
+            return corrected_mcqs, True
+
+        print(f"[Claude Agent ERROR] Chunk {index}: could not find valid JSON array in API response.")
+        return mcqs, False
 
     except Exception as e:
-        print(f"[Claude Agent ERROR] API validation error: {e}")
+        print(f"[Claude Agent ERROR] Chunk {index}: API validation error: {e}")
+        return mcqs, False
+
+
+def validate_with_model(mcqs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Validates MCQs using the Anthropic API.
+    The list is split into chunks validated concurrently; results are merged
+    back in order and only failed chunks fall back to their originals.
+    """
+    global _client
+    if _client is None:
+        print("[Claude Agent WARNING] Client not initialized, attempting to load now...")
+        load_model()
+        if _client is None:
+             print("[Claude Agent ERROR] Cannot validate, client failed to initialize.")
+             return mcqs
+
+    chunks = [
+        mcqs[start : start + VALIDATION_CHUNK_SIZE]
+        for start in range(0, len(mcqs), VALIDATION_CHUNK_SIZE)
+    ]
+    if not chunks:
         return mcqs
+    print(f"[Claude Agent] Validating {len(mcqs)} questions in {len(chunks)} chunks with {_model_name}...")
+
+    with ThreadPoolExecutor(
+        max_workers=min(VALIDATION_MAX_CONCURRENCY, len(chunks))
+    ) as executor:
+        # map keeps chunk order
+        results = list(executor.map(_validate_chunk, range(len(chunks)), chunks))
+
+    validated = [q for chunk_mcqs, _ in results for q in chunk_mcqs]
+    failed = sum(1 for _, ok in results if not ok)
+    print(f"[Claude Agent] Claude API returned {len(validated)} validated questions ({failed} of {len(chunks)} chunks kept originals).")
+    return validated
 
 def generate_response(prompt: str, temperature: float = 0.0) -> str:
     """
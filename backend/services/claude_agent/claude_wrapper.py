@@ -1,23 +1,55 @@
 from langchain.llms.base import LLM
-from typing import Optional, List
-import requests
+from typing import Any, Optional, List
 
 
 class ClaudeWrapper(LLM):
+    """
+    LangChain LLM for one route of the local Claude sidecar.
+
+    Requests go through the gateway's pooled keep-alive clients (sync for
+    _call, async for _acall) with their connect and read timeouts. While the
+    circuit breaker is open, calls raise CircuitOpenError at once instead of
+    waiting on an unhealthy sidecar.
+    """
+
     endpoint_url: str
+    model_name: str = "claude-sidecar"
     temperature: float = 0.0
+    http_client: Any
+    async_http_client: Any
+    breaker: Any = None
 
     @property
     def _llm_type(self) -> str:
         return "claude-validator"
 
-    def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
-        payload = {
+    @property
+    def _identifying_params(self) -> dict:
+        # reported as the run's model, so the metrics can price the call
+        return {"model_name": self.model_name, "temperature": self.temperature}
+
+    def _payload(self, prompt: str) -> dict:
+        return {
             "messages": [{"role": "user", "content": prompt}],
             "temperature": self.temperature,
         }
 
-        response = requests.post(self.endpoint_url, json=payload)
+    def _before_call(self) -> None:
+        if self.breaker is not None:
+            self.breaker.before_call()
+
+    def _record(self, ok: bool) -> None:
+        if self.breaker is None:
+            return
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def _parse(self, response, stop: Optional[List[str]]) -> str:
+        # 5xx and connection errors mean the sidecar is unhealthy; a 4xx is
+        # a problem with this request only
+        self._record(response.status_code < 500)
         response.raise_for_status()
 
         text = response.json().get("content", "")
@@ -27,3 +59,25 @@ class ClaudeWrapper(LLM):
                 text = text.split(s)[0]
 
         return text
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+        self._before_call()
+        try:
+            response = self.http_client.post(
+                self.endpoint_url, json=self._payload(prompt)
+            )
+        except Exception:
+            self._record(False)
+            raise
+        return self._parse(response, stop)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+        self._before_call()
+        try:
+            response = await self.async_http_client.post(
+                self.endpoint_url, json=self._payload(prompt)
+            )
+        except Exception:
+            self._record(False)
+            raise
+        return self._parse(response, stop)
@@ -1,59 +1,105 @@
 import os
 import re
 import json
-from typing import Any, Dict, List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-import openai
 import numpy as np
 import core.model_loader as loader
-from core.database import db
-from schemas.assessment import UserResponses
+from core.llm_gateway import llm_gateway
+from core.prompt_budget import (
+    PromptBudgetError,
+    count_tokens,
+    fit_to_budget,
+    prompt_token_stats,
+)
+from schemas.assessment import JobEnrichment, UserResponses
 from services.pinecone_service import PineconeService
 from services.scoring_service import calculate_score
-from models.firestore_models import (
-    get_follow_up_answers_by_user,
-    get_generated_questions,
-    add_user_skills_knowledge,
-    get_latest_attempt_number,
-)
+from services.enrichment_cache import create_enrichment_cache
+from services.pipeline_context import PipelineContext
+from models.firestore_models import add_user_skills_knowledge
 
 # -----------------------------
-# Env & OpenAI client
+# Env
 # -----------------------------
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY not found. Please set it in your .env file.")
 
-client = openai.OpenAI(api_key=OPENAI_API_KEY)
-
 # initialize Pinecone service
 pinecone_service = PineconeService(index_name="code-map")
 
+# bump when the summary or extraction prompts change so the offline
+# enrichment stage and the enrichment cache know which results are stale
+JOB_ENRICHMENT_VERSION = "v1"
+
+# "combined": one JSON call per job for summary, skills and knowledge
+# "split": the original three separate prompts
+JOB_ENRICHMENT_MODE = os.getenv("JOB_ENRICHMENT_MODE", "combined")
+
+# persistent read-through cache for live per-job enrichment
+enrichment_cache = create_enrichment_cache(JOB_ENRICHMENT_VERSION)
+
 
 # -----------------------------
 # OpenAI call function
 # -----------------------------
-def call_openai(prompt: str, max_tokens=2000, temperature=0.2) -> str:
+OPENAI_MODEL = "gpt-4o"
+
+
+SYSTEM_PROMPT = (
+    "You are an assistant that returns clean, concise outputs. "
+    "Write in a professional, neutral tone; avoid buzzwords."
+)
+
+
+def call_openai(
+    prompt: str,
+    max_tokens=2000,
+    temperature=0.2,
+    use_cache: bool = True,
+    json_mode: bool = False,
+    call_site: str = "embedding_service",
+) -> str:
     """
     Generate a descriptive profile text from OpenAI based on a prompt.
+    Goes through the shared LLM gateway (pooled client, response cache).
     """
-    resp = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are an assistant that returns clean, concise outputs. "
-                    "Write in a professional, neutral tone; avoid buzzwords."
-                ),
-            },
-            {"role": "user", "content": prompt},
-        ],
+    return llm_gateway.chat(
+        prompt,
+        system=SYSTEM_PROMPT,
+        model=OPENAI_MODEL,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        json_mode=json_mode,
+        use_cache=use_cache,
+        call_site=call_site,
+    )
+
+
+async def acall_openai(
+    prompt: str,
+    max_tokens=2000,
+    temperature=0.2,
+    use_cache: bool = True,
+    json_mode: bool = False,
+    call_site: str = "embedding_service",
+) -> str:
+    """Async version of call_openai on the gateway's pooled AsyncOpenAI client"""
+    return await llm_gateway.achat(
+        prompt,
+        system=SYSTEM_PROMPT,
+        model=OPENAI_MODEL,
         max_tokens=max_tokens,
         temperature=temperature,
+        json_mode=json_mode,
+        use_cache=use_cache,
+        call_site=call_site,
     )
-    return resp.choices[0].message.content.strip()
 
 
 def normalize_option(opt: str) -> str:
@@ -66,28 +112,40 @@ def normalize_option(opt: str) -> str:
 # -----------------------------
 # Data aggregation for a user
 # -----------------------------
-def get_user_embedding_data(user_test_id: str) -> Dict[str, Any]:
+def get_user_embedding_data(
+    user_test_id: str, context: Optional[PipelineContext] = None
+) -> Dict[str, Any]:
     """
     Fetch user responses and follow-up results, compute score, build combined_data.
     score reflects how consistent/true the skillReflection is relative to follow-up answers.
+    Pass the request's PipelineContext so every stage shares one set of reads.
     """
+    context = context or PipelineContext(user_test_id)
+    return context.memo(
+        "combined_data",
+        partial(_build_user_embedding_data, user_test_id, context),
+        is_read=False,
+    )
+
+
+def _build_user_embedding_data(
+    user_test_id: str, context: PipelineContext
+) -> Dict[str, Any]:
     # fetch Firestore doc (dict)
-    doc_ref = db.collection("user_tests").document(user_test_id).get()
-    if not doc_ref.exists:
+    doc = context.user_test_doc()
+    if doc is None:
         return {"error": f"No user responses found for {user_test_id}"}
 
-    doc = doc_ref.to_dict()
-
     try:
         # convert dict → Pydantic model
         user_res = UserResponses(**doc)
 
-        latest_attempt = get_latest_attempt_number(user_test_id)
+        latest_attempt = context.latest_attempt()
         print(f"Latest attempt for user_test_id {user_test_id}: {latest_attempt}")
 
         # fetch all data once
-        follow_ups = get_follow_up_answers_by_user(user_test_id, latest_attempt)
-        user_questions = get_generated_questions(user_test_id, latest_attempt)
+        follow_ups = context.follow_ups(latest_attempt)
+        user_questions = context.generated_questions(latest_attempt)
 
         # build lookup table for O(1) question match
         question_lookup = {q["id"]: q for q in user_questions}
@@ -151,19 +209,62 @@ def get_user_embedding_data(user_test_id: str) -> Dict[str, Any]:
         return {"error": f"Failed to parse user responses: {str(e)}"}
 
 
+async def aget_user_embedding_data(
+    user_test_id: str, context: Optional[PipelineContext] = None
+) -> Dict[str, Any]:
+    """
+    Async wrapper around get_user_embedding_data.
+    The Firestore client is synchronous, so the reads run in a worker thread.
+    """
+    return await asyncio.to_thread(get_user_embedding_data, user_test_id, context)
+
+
 # -----------------------------
-# Analyze user skills & knowledge
+# Compact combined_data for prompts
 # -----------------------------
-def analyze_user_skills_knowledge(user_test_id: str) -> Dict[str, Any]:
-    combined_data = get_user_embedding_data(user_test_id)
-    if "error" in combined_data:
-        return combined_data
+# input-token budgets for the serialized user data in each prompt
+PROFILE_PROMPT_MAX_DATA_TOKENS = int(os.getenv("PROFILE_PROMPT_MAX_DATA_TOKENS", "3000"))
+SKILLS_PROMPT_MAX_DATA_TOKENS = int(os.getenv("SKILLS_PROMPT_MAX_DATA_TOKENS", "3000"))
+
 
-    prompt = f"""
+def _serialize_user_data(
+    prompt_name: str, combined_data: Dict[str, Any], max_tokens: int
+) -> str:
+    """
+    Minified JSON of combined_data within the prompt's token budget.
+    The ids are dropped; they carry no signal for the model.
+    """
+    data = {k: v for k, v in combined_data.items() if k != "user_test_id"}
+    data["follow_up_results"] = [
+        {k: v for k, v in r.items() if k != "question_id"}
+        for r in combined_data.get("follow_up_results", [])
+    ]
+    try:
+        serialized = fit_to_budget(data, max_tokens, model=OPENAI_MODEL)
+    except PromptBudgetError as e:
+        # send the most-trimmed payload rather than failing the whole pipeline
+        print(f"[Prompt Budget WARNING] {prompt_name}: {e}; sending it trimmed")
+        serialized = e.text
+    prompt_token_stats.record(
+        prompt_name,
+        sent_tokens=count_tokens(serialized, OPENAI_MODEL),
+        baseline_tokens=count_tokens(str(combined_data), OPENAI_MODEL),
+    )
+    return serialized
+
+
+# -----------------------------
+# Analyze user skills & knowledge
+# -----------------------------
+def _build_skills_knowledge_prompt(combined_data: Dict[str, Any]) -> str:
+    user_data = _serialize_user_data(
+        "skills_knowledge", combined_data, SKILLS_PROMPT_MAX_DATA_TOKENS
+    )
+    return f"""
     Analyze the following student's data.
 
     INPUT DATA:
-    {combined_data}
+    {user_data}
 
     TASK:
     1. Extract **technical skills** from: skillReflection, programmingLanguages, follow_up_results.
@@ -184,18 +285,16 @@ def analyze_user_skills_knowledge(user_test_id: str) -> Dict[str, Any]:
     No markdown, comments, or extra text.
     """
 
+
+def _save_skills_knowledge(
+    user_test_id: str, response: str, save: bool = True
+) -> Dict[str, Any]:
+    """
+    Parse the skills/knowledge JSON returned by OpenAI and store it in Firestore
+    (only returned when save is False).
+    """
     try:
-        response = call_openai(prompt, max_tokens=500, temperature=0.2)
-        cleaned_response = response.strip()
-
-        # remove code block markers if present
-        if cleaned_response.startswith("```json"):
-            cleaned_response = cleaned_response[7:]
-        elif cleaned_response.startswith("```"):
-            cleaned_response = cleaned_response[3:]
-        if cleaned_response.endswith("```"):
-            cleaned_response = cleaned_response[:-3]
-        cleaned_response = cleaned_response.strip()
+        cleaned_response = clean_openai_json(response)
 
         # parse JSON
         result = json.loads(cleaned_response)
@@ -203,6 +302,8 @@ def analyze_user_skills_knowledge(user_test_id: str) -> Dict[str, Any]:
         # store as JSON dicts
         skills_dict = result.get("skills", {})
         knowledge_dict = result.get("knowledge", {})
+        if not save:
+            return {"skills": skills_dict, "knowledge": knowledge_dict}
 
         try:
             add_user_skills_knowledge(
@@ -226,6 +327,50 @@ def analyze_user_skills_knowledge(user_test_id: str) -> Dict[str, Any]:
         return {"error": error_msg}
 
 
+def _analysis_failed(e: Exception) -> Dict[str, Any]:
+    error_msg = f"Failed to analyze skills/knowledge: {str(e)}. Response: No response"
+    print(error_msg)
+    return {"error": error_msg}
+
+
+def analyze_user_skills_knowledge(
+    user_test_id: str, context: Optional[PipelineContext] = None
+) -> Dict[str, Any]:
+    combined_data = get_user_embedding_data(user_test_id, context)
+    if "error" in combined_data:
+        return combined_data
+
+    prompt = _build_skills_knowledge_prompt(combined_data)
+    try:
+        response = call_openai(
+            prompt, max_tokens=500, temperature=0.2, call_site="skills_knowledge"
+        )
+    except Exception as e:
+        return _analysis_failed(e)
+
+    return _save_skills_knowledge(user_test_id, response)
+
+
+async def aanalyze_user_skills_knowledge(
+    user_test_id: str, context: Optional[PipelineContext] = None, save: bool = True
+) -> Dict[str, Any]:
+    combined_data = await aget_user_embedding_data(user_test_id, context)
+    if "error" in combined_data:
+        return combined_data
+
+    prompt = _build_skills_knowledge_prompt(combined_data)
+    try:
+        response = await acall_openai(
+            prompt, max_tokens=500, temperature=0.2, call_site="skills_knowledge"
+        )
+    except Exception as e:
+        return _analysis_failed(e)
+
+    return await asyncio.to_thread(
+        _save_skills_knowledge, user_test_id, response, save
+    )
+
+
 # -----------------------------
 # Profile generation via OpenAI
 # -----------------------------
@@ -233,27 +378,37 @@ def _build_profile_prompt(combined_data: Dict[str, Any]) -> str:
     """
     Build a concise, evidence-based user profile for embedding.
     """
+    user_data = _serialize_user_data(
+        "user_profile", combined_data, PROFILE_PROMPT_MAX_DATA_TOKENS
+    )
     return (
         "Write a concise, objective profile of the user based on the data below. "
         "Highlight technical skills, knowledge areas, strengths, weaknesses, and realistic next steps. "
         "Use 'score' to weigh how accurate the user's self-assessed skills are (higher = more accurate). "
         "Include only meaningful, evidence-based points. "
         "Return exactly one paragraph.\n\n"
-        f"USER DATA:\n{combined_data}\n\n"
+        f"USER DATA:\n{user_data}\n\n"
     )
 
 
 def generate_user_profile_text(combined_data: Dict[str, Any]) -> str:
     prompt = _build_profile_prompt(combined_data)
-    return call_openai(prompt)
+    return call_openai(prompt, call_site="user_profile")
+
+
+async def agenerate_user_profile_text(combined_data: Dict[str, Any]) -> str:
+    prompt = _build_profile_prompt(combined_data)
+    return await acall_openai(prompt, call_site="user_profile")
 
 
 # -----------------------------
 # Create user embedding
 # -----------------------------
-def create_user_embedding(user_test_id: str) -> Dict[str, Any]:
+def create_user_embedding(
+    user_test_id: str, context: Optional[PipelineContext] = None
+) -> Dict[str, Any]:
     print(f"=== CREATE_USER_EMBEDDING DEBUG ===")
-    combined_data = get_user_embedding_data(user_test_id)
+    combined_data = get_user_embedding_data(user_test_id, context)
     print(
         f"Combined data: {'error' in combined_data if isinstance(combined_data, dict) else 'Not dict'}"
     )
@@ -278,6 +433,31 @@ def create_user_embedding(user_test_id: str) -> Dict[str, Any]:
     }
 
 
+async def acreate_user_embedding(
+    user_test_id: str, context: Optional[PipelineContext] = None
+) -> Dict[str, Any]:
+    combined_data = await aget_user_embedding_data(user_test_id, context)
+    if "error" in combined_data:
+        print(f"Error in combined_data: {combined_data.get('error')}")
+        return combined_data
+
+    profile_text = await agenerate_user_profile_text(combined_data)
+    print(f"Profile text generated: {len(profile_text) if profile_text else 0} chars")
+
+    # model inference is CPU-bound, keep it off the event loop
+    user_embedding = await asyncio.to_thread(loader.get_embeddings, profile_text)
+    print(
+        f"Embedding generated: {len(user_embedding) if user_embedding else 0} dimensions"
+    )
+
+    return {
+        "user_test_id": user_test_id,
+        "profile_text": profile_text,
+        "user_embedding": user_embedding,
+        "combined_data": combined_data,
+    }
+
+
 # -----------------------------
 # Helper functions for OpenAI parsing
 # -----------------------------
@@ -376,59 +556,99 @@ def store_user_in_pinecone(user_test_id: str) -> Dict[str, Any]:
 # -----------------------------
 # Extract job skills and knowledge
 # -----------------------------
-def extract_job_skills_knowledge(job_description: str) -> Dict[str, Any]:
+def _build_job_skills_prompt(job_description: str) -> str:
+    return (
+        "ANALYZE THIS JOB DESCRIPTION AND EXTRACT ALL REQUIRED SKILLS WITH PROFICIENCY LEVELS:\n\n"
+        f"{job_description}\n\n"
+        "DEFINITION:\n"
+        "- Skills are abilities or tools that a person can use to perform tasks.\n"
+        "- Examples of skills: programming languages, frameworks, libraries, software, platforms, or tools.\n"
+        "- Do NOT include theoretical knowledge, concepts, or methodologies.\n\n"
+        "EXTRACTION RULES:\n"
+        "1. Extract ONLY technical skills: programming languages, frameworks, libraries, tools, software, and platforms.\n"
+        "2. Assign a proficiency level for each skill: **ONLY** Basic, Intermediate, or Advanced.\n"
+        '3. Respond STRICTLY in JSON format as a dictionary: {"Skill Name": "Level", ...} without any additional text.\n'
+        "4. Be as specific as possible: if 'Python with Django' is mentioned, include 'Python' and 'Django' as separate entries.\n"
+        "5. Exclude soft skills and natural languages.\n"
+        "6. Include skills mentioned in requirements, qualifications, or responsibilities sections.\n"
+        "7. Remove duplicates and keep the most specific term.\n"
+        "8. If multiple skills are mentioned together, create separate entries for each.\n"
+        "9. DO NOT include explanations, markdown, or code blocks.\n\n"
+        "EXAMPLE OUTPUT:\n"
+        '{"Python": "Basic", "Django": "Intermediate", "SQL": "Advanced"}'
+    )
+
+
+def _build_job_knowledge_prompt(job_description: str) -> str:
+    return (
+        "ANALYZE THIS JOB DESCRIPTION AND EXTRACT ALL REQUIRED KNOWLEDGE AREAS WITH PROFICIENCY LEVELS:\n\n"
+        f"{job_description}\n\n"
+        "- Knowledge is the understanding of concepts, theories, methodologies, or domains.\n"
+        "- Examples of knowledge: Algorithms, Data Structures, Machine Learning, Web Development, Cybersecurity.\n"
+        "- Do NOT include specific tools, software, or platforms.\n\n"
+        "EXTRACTION RULES:\n"
+        "1. Extract ONLY knowledge domains, concepts, methodologies, and specialized areas.\n"
+        "2. Assign a proficiency level for each: **ONLY** Basic, Intermediate, or Advanced.\n"
+        '3. Respond STRICTLY in JSON format as a dictionary: {"Knowledge Name": "Level", ...}\n'
+        "4. Be as specific as possible: if 'Mathematics (Linear Algebra, Probability)' is mentioned, include 'Mathematics', 'Linear Algebra' and 'Probability' as separate entries.\n"
+        "5. Exclude soft skills and natural languages.\n"
+        "6. Remove duplicates and keep the most specific term.\n"
+        "7. If multiple knowledge areas are mentioned together, create separate entries for each.\n"
+        "8. DO NOT include explanations, markdown, or code blocks.\n\n"
+        "EXAMPLE OUTPUT:\n"
+        '{"Algorithms": "Basic", "Machine Learning": "Advanced", "Database Systems": "Intermediate"}'
+    )
+
+
+def extract_job_skills(job_description: str) -> Dict[str, str]:
     """
-    Extract skills and knowledge from job description using OpenAI
+    Extract required skills from a job description using OpenAI
     """
-    try:
-        skills_prompt = (
-            "ANALYZE THIS JOB DESCRIPTION AND EXTRACT ALL REQUIRED SKILLS WITH PROFICIENCY LEVELS:\n\n"
-            f"{job_description}\n\n"
-            "DEFINITION:\n"
-            "- Skills are abilities or tools that a person can use to perform tasks.\n"
-            "- Examples of skills: programming languages, frameworks, libraries, software, platforms, or tools.\n"
-            "- Do NOT include theoretical knowledge, concepts, or methodologies.\n\n"
-            "EXTRACTION RULES:\n"
-            "1. Extract ONLY technical skills: programming languages, frameworks, libraries, tools, software, and platforms.\n"
-            "2. Assign a proficiency level for each skill: **ONLY** Basic, Intermediate, or Advanced.\n"
-            '3. Respond STRICTLY in JSON format as a dictionary: {"Skill Name": "Level", ...} without any additional text.\n'
-            "4. Be as specific as possible: if 'Python with Django' is mentioned, include 'Python' and 'Django' as separate entries.\n"
-            "5. Exclude soft skills and natural languages.\n"
-            "6. Include skills mentioned in requirements, qualifications, or responsibilities sections.\n"
-            "7. Remove duplicates and keep the most specific term.\n"
-            "8. If multiple skills are mentioned together, create separate entries for each.\n"
-            "9. DO NOT include explanations, markdown, or code blocks.\n\n"
-            "EXAMPLE OUTPUT:\n"
-            '{"Python": "Basic", "Django": "Intermediate", "SQL": "Advanced"}'
-        )
+    skills_response = call_openai(
+        _build_job_skills_prompt(job_description),
+        max_tokens=300,
+        call_site="job_skills",
+    )
+    return parse_json_response(skills_response, "skills")
 
-        knowledge_prompt = (
-            "ANALYZE THIS JOB DESCRIPTION AND EXTRACT ALL REQUIRED KNOWLEDGE AREAS WITH PROFICIENCY LEVELS:\n\n"
-            f"{job_description}\n\n"
-            "- Knowledge is the understanding of concepts, theories, methodologies, or domains.\n"
-            "- Examples of knowledge: Algorithms, Data Structures, Machine Learning, Web Development, Cybersecurity.\n"
-            "- Do NOT include specific tools, software, or platforms.\n\n"
-            "EXTRACTION RULES:\n"
-            "1. Extract ONLY knowledge domains, concepts, methodologies, and specialized areas.\n"
-            "2. Assign a proficiency level for each: **ONLY** Basic, Intermediate, or Advanced.\n"
-            '3. Respond STRICTLY in JSON format as a dictionary: {"Knowledge Name": "Level", ...}\n'
-            "4. Be as specific as possible: if 'Mathematics (Linear Algebra, Probability)' is mentioned, include 'Mathematics', 'Linear Algebra' and 'Probability' as separate entries.\n"
-            "5. Exclude soft skills and natural languages.\n"
-            "6. Remove duplicates and keep the most specific term.\n"
-            "7. If multiple knowledge areas are mentioned together, create separate entries for each.\n"
-            "8. DO NOT include explanations, markdown, or code blocks.\n\n"
-            "EXAMPLE OUTPUT:\n"
-            '{"Algorithms": "Basic", "Machine Learning": "Advanced", "Database Systems": "Intermediate"}'
-        )
 
-        # Extract skills
-        skills_response = call_openai(skills_prompt, max_tokens=300)
-        skills_dict = parse_json_response(skills_response, "skills")
+def extract_job_knowledge(job_description: str) -> Dict[str, str]:
+    """
+    Extract required knowledge areas from a job description using OpenAI
+    """
+    knowledge_response = call_openai(
+        _build_job_knowledge_prompt(job_description),
+        max_tokens=300,
+        call_site="job_knowledge",
+    )
+    return parse_json_response(knowledge_response, "knowledge")
+
+
+async def aextract_job_skills(job_description: str) -> Dict[str, str]:
+    skills_response = await acall_openai(
+        _build_job_skills_prompt(job_description),
+        max_tokens=300,
+        call_site="job_skills",
+    )
+    return parse_json_response(skills_response, "skills")
+
+
+async def aextract_job_knowledge(job_description: str) -> Dict[str, str]:
+    knowledge_response = await acall_openai(
+        _build_job_knowledge_prompt(job_description),
+        max_tokens=300,
+        call_site="job_knowledge",
+    )
+    return parse_json_response(knowledge_response, "knowledge")
 
-        # Extract knowledge
-        knowledge_response = call_openai(knowledge_prompt, max_tokens=300)
-        knowledge_dict = parse_json_response(knowledge_response, "knowledge")
 
+def extract_job_skills_knowledge(job_description: str) -> Dict[str, Any]:
+    """
+    Extract skills and knowledge from job description using OpenAI
+    """
+    try:
+        skills_dict = extract_job_skills(job_description)
+        knowledge_dict = extract_job_knowledge(job_description)
         return {"skills": skills_dict, "knowledge": knowledge_dict}
 
     except Exception as e:
@@ -436,9 +656,374 @@ def extract_job_skills_knowledge(job_description: str) -> Dict[str, Any]:
         return {"skills": {}, "knowledge": {}}
 
 
+# -----------------------------
+# Job summary & enrichment
+# -----------------------------
+def _build_job_summary_prompt(job_description: str) -> str:
+    return (
+        "Summarize the following job description in one concise, professional paragraph. "
+        "Focus on core responsibilities and tasks of the career. "
+        "Start with 'This career involves...'"
+        "Avoid mentioning overly detailed information such as the company, years of experience, etc."
+        "Keep it under 400 characters.\n\n"
+        f"JOB DESCRIPTION:\n{job_description}\n\n"
+        "Return only the cleaned-up job description without any additional text."
+    )
+
+
+def summarize_job_description(job_description: str) -> str:
+    """
+    Summarize a raw job description into one short paragraph using OpenAI
+    """
+    return call_openai(
+        _build_job_summary_prompt(job_description),
+        max_tokens=400,
+        call_site="job_summary",
+    )
+
+
+async def asummarize_job_description(job_description: str) -> str:
+    return await acall_openai(
+        _build_job_summary_prompt(job_description),
+        max_tokens=400,
+        call_site="job_summary",
+    )
+
+
+def _build_job_enrichment_prompt(job_description: str) -> str:
+    return (
+        "ANALYZE THIS JOB DESCRIPTION AND RETURN ITS SUMMARY, REQUIRED SKILLS AND REQUIRED KNOWLEDGE:\n\n"
+        f"{job_description}\n\n"
+        "SUMMARY RULES:\n"
+        "- One concise, professional paragraph starting with 'This career involves...'.\n"
+        "- Focus on core responsibilities and tasks; avoid company names, years of experience, etc.\n"
+        "- Keep it under 400 characters.\n\n"
+        "SKILLS RULES:\n"
+        "- ONLY technical skills: programming languages, frameworks, libraries, tools, software, and platforms.\n"
+        "- Do NOT include theoretical knowledge, concepts, or methodologies.\n"
+        "- Be specific: 'Python with Django' becomes 'Python' and 'Django'.\n\n"
+        "KNOWLEDGE RULES:\n"
+        "- ONLY knowledge domains, concepts, methodologies, and specialized areas.\n"
+        "- Do NOT include specific tools, software, or platforms.\n"
+        "- Be specific: 'Mathematics (Linear Algebra, Probability)' becomes 'Mathematics', 'Linear Algebra' and 'Probability'.\n\n"
+        "COMMON RULES:\n"
+        "- Assign each skill/knowledge a level: **ONLY** Basic, Intermediate, or Advanced.\n"
+        "- Exclude soft skills and natural languages; remove duplicates and keep the most specific term.\n\n"
+        "Respond STRICTLY with one JSON object, no markdown or explanations:\n"
+        '{"summary": "This career involves...", '
+        '"skills": {"Python": "Basic", "Django": "Intermediate"}, '
+        '"knowledge": {"Algorithms": "Basic", "Machine Learning": "Advanced"}}'
+    )
+
+
+def _parse_job_enrichment(response: str) -> Dict[str, Any]:
+    """
+    Validate the combined enrichment JSON against JobEnrichment, falling back
+    to the same lenient parsing as the per-field prompts.
+    Raises ValueError if no usable summary comes back.
+    """
+    parsed = parse_json_response(response, "job enrichment")
+
+    try:
+        enrichment = JobEnrichment(**parsed)
+    except Exception as e:
+        print(f"Job enrichment failed schema validation: {e}")
+        # keep whichever fields are still well-formed
+        enrichment = JobEnrichment(
+            summary=str(parsed.get("summary") or ""),
+            skills=_string_levels(parsed.get("skills")),
+            knowledge=_string_levels(parsed.get("knowledge")),
+        )
+
+    if not enrichment.summary:
+        raise ValueError("Job enrichment response has no summary")
+
+    return {
+        "summary": enrichment.summary.strip(),
+        "skills": enrichment.skills,
+        "knowledge": enrichment.knowledge,
+    }
+
+
+def enrich_job_description(job_description: str) -> Dict[str, Any]:
+    """
+    Summary, skills and knowledge for a job in one JSON-mode OpenAI call.
+    """
+    response = call_openai(
+        _build_job_enrichment_prompt(job_description),
+        max_tokens=900,
+        json_mode=True,
+        call_site="job_enrichment",
+    )
+    return _parse_job_enrichment(response)
+
+
+async def aenrich_job_description(job_description: str) -> Dict[str, Any]:
+    response = await acall_openai(
+        _build_job_enrichment_prompt(job_description),
+        max_tokens=900,
+        json_mode=True,
+        call_site="job_enrichment",
+    )
+    return _parse_job_enrichment(response)
+
+
+def _string_levels(value: Any) -> Dict[str, str]:
+    if not isinstance(value, dict):
+        return {}
+    return {str(k): str(v) for k, v in value.items() if isinstance(v, (str, int))}
+
+
+def enrich_job(job_description: str) -> Dict[str, Any]:
+    """
+    Compute summary, required skills and required knowledge for a single job.
+    Used by the offline catalog enrichment stage.
+    """
+    if JOB_ENRICHMENT_MODE == "combined":
+        try:
+            result = enrich_job_description(job_description)
+            return {
+                "summary": result["summary"],
+                "required_skills": result["skills"],
+                "required_knowledge": result["knowledge"],
+            }
+        except Exception as e:
+            print(f"Combined enrichment failed, falling back to separate prompts: {e}")
+
+    summary = summarize_job_description(job_description)
+    extraction_result = extract_job_skills_knowledge(job_description)
+
+    return {
+        "summary": summary,
+        "required_skills": extraction_result.get("skills", {}),
+        "required_knowledge": extraction_result.get("knowledge", {}),
+    }
+
+
 # -----------------------------
 # Match user to job (Pinecone version)
 # -----------------------------
+# bounded concurrency for live per-job enrichment (up to 3 calls per matched job)
+MATCH_ENRICHMENT_MAX_WORKERS = int(os.getenv("MATCH_ENRICHMENT_MAX_WORKERS", "9"))
+
+
+def _non_empty(result: Dict[str, Any]) -> bool:
+    # extraction returns an empty dict on failure; don't cache those
+    return bool(result)
+
+
+# enrichment cache field -> (sync compute, async compute, is_cacheable)
+_ENRICHMENT_TASKS = {
+    "combined": (enrich_job_description, aenrich_job_description, bool),
+    "summary": (summarize_job_description, asummarize_job_description, bool),
+    "skills": (extract_job_skills, aextract_job_skills, _non_empty),
+    "knowledge": (extract_job_knowledge, aextract_job_knowledge, _non_empty),
+}
+
+# match field -> enrichment cache field used in split mode
+_SPLIT_ENRICHMENT_FIELDS = {
+    "job_description": "summary",
+    "required_skills": "skills",
+    "required_knowledge": "knowledge",
+}
+
+
+def _plan_enrichment_tasks(missing: List[str]) -> Dict[str, List[str]]:
+    """
+    Group the match fields still missing for a job into enrichment calls:
+    cache field -> match fields it fills.
+    """
+    if JOB_ENRICHMENT_MODE == "combined":
+        return {"combined": missing}
+    return {_SPLIT_ENRICHMENT_FIELDS[field]: [field] for field in missing}
+
+
+def _to_match_fields(task: str, value: Any, fields: List[str]) -> Dict[str, Any]:
+    if task == "combined":
+        updates = {
+            "job_description": value["summary"],
+            "required_skills": value["skills"],
+            "required_knowledge": value["knowledge"],
+        }
+        return {field: updates[field] for field in fields}
+    return {fields[0]: value}
+
+
+def _combined_failed(job: Dict[str, Any], e: Exception) -> None:
+    print(
+        f"Combined enrichment failed for job {job['job_id']}, "
+        f"falling back to separate prompts: {e}"
+    )
+
+
+def _split_failed(job: Dict[str, Any], task: str, e: Exception) -> None:
+    # that field keeps its metadata value
+    print(f"OpenAI error for job {job['job_id']} ({task}): {e}")
+
+
+def _run_enrichment_task(
+    job: Dict[str, Any], task: str, fields: List[str]
+) -> Dict[str, Any]:
+    compute_fn, _, is_cacheable = _ENRICHMENT_TASKS[task]
+    description = job["description"]
+    try:
+        value = enrichment_cache.get_or_compute(
+            job["job_id"],
+            description,
+            task,
+            partial(compute_fn, description),
+            is_cacheable,
+        )
+    except Exception as e:
+        if task != "combined":
+            raise
+        # same fallback as enrich_job: one prompt per missing field
+        _combined_failed(job, e)
+        updates = {}
+        for field in fields:
+            split_task = _SPLIT_ENRICHMENT_FIELDS[field]
+            try:
+                updates.update(_run_enrichment_task(job, split_task, [field]))
+            except Exception as split_error:
+                _split_failed(job, split_task, split_error)
+        return updates
+    return _to_match_fields(task, value, fields)
+
+
+async def _arun_enrichment_task(
+    job: Dict[str, Any], task: str, fields: List[str]
+) -> Dict[str, Any]:
+    _, acompute_fn, is_cacheable = _ENRICHMENT_TASKS[task]
+    description = job["description"]
+    try:
+        value = await enrichment_cache.aget_or_compute(
+            job["job_id"],
+            description,
+            task,
+            partial(acompute_fn, description),
+            is_cacheable,
+        )
+    except Exception as e:
+        if task != "combined":
+            raise
+        _combined_failed(job, e)
+        split_tasks = [_SPLIT_ENRICHMENT_FIELDS[field] for field in fields]
+        results = await asyncio.gather(
+            *(
+                _arun_enrichment_task(job, split_task, [field])
+                for split_task, field in zip(split_tasks, fields)
+            ),
+            return_exceptions=True,
+        )
+        updates = {}
+        for split_task, result in zip(split_tasks, results):
+            if isinstance(result, Exception):
+                _split_failed(job, split_task, result)
+                continue
+            updates.update(result)
+        return updates
+    return _to_match_fields(task, value, fields)
+
+
+def _parse_job_match(
+    user_test_id: str,
+    job_index: int,
+    job_match: Dict[str, Any],
+    use_openai_summary: bool,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Build match data from Pinecone metadata only, plus a description of the
+    live enrichment still needed for fields the catalog doesn't provide yet.
+    """
+    similarity_score = job_match["score"]
+    similarity_percentage = round(similarity_score * 100, 2)
+    job_metadata = job_match["metadata"]
+
+    # extract job details from metadata
+    job_title = job_metadata.get("title", "N/A")
+    original_job_desc = job_metadata.get("description", "N/A")
+    job_id = job_metadata.get("job_id", job_match["id"])  # use match ID as fallback
+
+    # initialize with metadata values
+    required_skills = {}
+    required_knowledge = {}
+
+    # try to parse skills/knowledge from metadata
+    try:
+        if job_metadata.get("required_skills"):
+            required_skills = json.loads(job_metadata.get("required_skills", "{}"))
+        if job_metadata.get("required_knowledge"):
+            required_knowledge = json.loads(
+                job_metadata.get("required_knowledge", "{}")
+            )
+    except json.JSONDecodeError:
+        print(f"Failed to parse skills/knowledge for job {job_id}")
+
+    match_data = {
+        "user_test_id": str(user_test_id),
+        "job_index": job_index,  # MUST be 0, 1, 2
+        "job_title": job_title,
+        "job_description": original_job_desc,
+        "similarity_score": similarity_score,
+        "similarity_percentage": similarity_percentage,
+        "required_skills": required_skills,
+        "required_knowledge": required_knowledge,
+    }
+
+    job = {"job_id": job_id, "description": original_job_desc, "tasks": {}}
+    if not use_openai_summary or original_job_desc == "N/A":
+        return match_data, job
+
+    # use the fields precomputed by the offline enrichment stage if present
+    precomputed_summary = job_metadata.get("summary", "")
+    is_enriched = bool(job_metadata.get("enrichment_version"))
+
+    if precomputed_summary:
+        match_data["job_description"] = precomputed_summary
+        print(f"Using precomputed summary for job: {job_title}")
+
+    # only extract skills/knowledge if not already in metadata
+    missing = []
+    if not precomputed_summary:
+        missing.append("job_description")
+    if not is_enriched and not required_skills:
+        missing.append("required_skills")
+    if not is_enriched and not required_knowledge:
+        missing.append("required_knowledge")
+
+    if missing:
+        job["tasks"] = _plan_enrichment_tasks(missing)
+    return match_data, job
+
+
+def _query_job_matches(
+    user_test_id: str, user_embedding: List[float], use_openai_summary: bool
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    print(f"=== MATCH_USER_TO_JOB DEBUG ===")
+    print(f"User test ID: {user_test_id}")
+    print(f"User embedding type: {type(user_embedding)}")
+    print(f"User embedding length: {len(user_embedding) if user_embedding else 0}")
+    print(f"User embedding sample: {user_embedding[:5] if user_embedding else 'None'}")
+
+    # query Pinecone for similar jobs
+    similar_jobs = pinecone_service.query_similar_jobs(
+        user_embedding=user_embedding, top_k=3
+    )
+
+    print(f"Similar jobs found: {len(similar_jobs) if similar_jobs else 0}")
+    print(f"Similar jobs: {similar_jobs}")
+
+    job_matches = []
+    jobs = []
+    for i, job_match in enumerate(similar_jobs or []):
+        match_data, job = _parse_job_match(
+            user_test_id, i, job_match, use_openai_summary
+        )
+        job_matches.append(match_data)
+        jobs.append(job)
+    return job_matches, jobs
+
+
 def match_user_to_job(
     user_test_id: str,
     user_embedding: List[float],
@@ -446,105 +1031,117 @@ def match_user_to_job(
 ) -> Dict[str, Any]:
     """
     Query Pinecone for similar jobs using user embedding.
+    Live enrichment calls for all matched jobs run concurrently; a failed
+    call only leaves that job's fields at their metadata values.
     """
     try:
-        print(f"=== MATCH_USER_TO_JOB DEBUG ===")
-        print(f"User test ID: {user_test_id}")
-        print(f"User embedding type: {type(user_embedding)}")
-        print(f"User embedding length: {len(user_embedding) if user_embedding else 0}")
-        print(
-            f"User embedding sample: {user_embedding[:5] if user_embedding else 'None'}"
+        # job_matches keeps Pinecone order, so job_index stays 0, 1, 2
+        job_matches, jobs = _query_job_matches(
+            user_test_id, user_embedding, use_openai_summary
         )
+        if not job_matches:
+            print("No similar jobs found in Pinecone")
+            return {"error": "No matching jobs found"}
 
-        # query Pinecone for similar jobs
-        similar_jobs = pinecone_service.query_similar_jobs(
-            user_embedding=user_embedding, top_k=3
-        )
+        print(f"Found {len(job_matches)} potential job matches")
+
+        live_tasks = [
+            (i, task, fields)
+            for i, job in enumerate(jobs)
+            for task, fields in job["tasks"].items()
+        ]
+        if live_tasks:
+            with ThreadPoolExecutor(
+                max_workers=min(MATCH_ENRICHMENT_MAX_WORKERS, len(live_tasks))
+            ) as executor:
+                futures = {}
+                for i, task, fields in live_tasks:
+                    future = executor.submit(_run_enrichment_task, jobs[i], task, fields)
+                    futures[future] = (i, task)
+
+                for future in as_completed(futures):
+                    i, task = futures[future]
+                    try:
+                        job_matches[i].update(future.result())
+                        print(
+                            f"Generated OpenAI {task} for job: "
+                            f"{job_matches[i]['job_title']}"
+                        )
+                    except Exception as e:
+                        # keep metadata values if OpenAI fails
+                        print(f"OpenAI error for job {i} ({task}): {e}")
 
-        print(f"Similar jobs found: {len(similar_jobs) if similar_jobs else 0}")
-        print(f"Similar jobs: {similar_jobs}")
+        print(f"Returning {len(job_matches)} job matches")
 
-        if not similar_jobs:
-            print("No similar jobs found in Pinecone")
-            return {"error": "No matching jobs found"}
+        return {"job_matches": job_matches}
 
-        print(f"Found {len(similar_jobs)} potential job matches")
-        job_matches = []
+    except Exception as e:
+        error_msg = f"Failed to query jobs from Pinecone: {str(e)}"
+        print(error_msg)
+        return {"error": error_msg}
 
-        for i, job_match in enumerate(similar_jobs):
-            similarity_score = job_match["score"]
-            similarity_percentage = round(similarity_score * 100, 2)
-            job_metadata = job_match["metadata"]
 
-            # extract job details from metadata
-            job_title = job_metadata.get("title", "N/A")
-            original_job_desc = job_metadata.get("description", "N/A")
-            job_id = job_metadata.get(
-                "job_id", job_match["id"]
-            )  # use match ID as fallback
+async def aiter_job_matches(
+    user_test_id: str,
+    user_embedding: List[float],
+    use_openai_summary: bool = True,
+) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (rank, job_match) for each matched job as soon as its live
+    enrichment finishes, so callers can stream results. Enrichment runs on
+    the AsyncOpenAI client, bounded by MATCH_ENRICHMENT_MAX_WORKERS.
+    """
+    job_matches, jobs = await asyncio.to_thread(
+        _query_job_matches, user_test_id, user_embedding, use_openai_summary
+    )
+    print(f"Found {len(job_matches)} potential job matches")
 
-            # initialize with metadata values
-            job_desc = original_job_desc
-            required_skills = {}
-            required_knowledge = {}
+    semaphore = asyncio.Semaphore(MATCH_ENRICHMENT_MAX_WORKERS)
 
-            # try to parse skills/knowledge from metadata
+    async def run(i: int, task: str, fields: List[str]) -> None:
+        async with semaphore:
             try:
-                if job_metadata.get("required_skills"):
-                    required_skills = json.loads(
-                        job_metadata.get("required_skills", "{}")
-                    )
-                if job_metadata.get("required_knowledge"):
-                    required_knowledge = json.loads(
-                        job_metadata.get("required_knowledge", "{}")
-                    )
-            except json.JSONDecodeError:
-                print(f"Failed to parse skills/knowledge for job {job_id}")
-
-            # generate cleaned/comprehensive description using OpenAI if requested
-            if use_openai_summary and original_job_desc != "N/A":
-                try:
-                    summary_prompt = (
-                        "Summarize the following job description in one concise, professional paragraph. "
-                        "Focus on core responsibilities and tasks of the career. "
-                        "Start with 'This career involves...'"
-                        "Avoid mentioning overly detailed information such as the company, years of experience, etc."
-                        "Keep it under 400 characters.\n\n"
-                        f"JOB DESCRIPTION:\n{original_job_desc}\n\n"
-                        "Return only the cleaned-up job description without any additional text."
-                    )
-
-                    job_desc = call_openai(summary_prompt, max_tokens=400)
-                    print(f"Generated OpenAI summary for job: {job_title}")
-
-                    # only extract skills/knowledge if not already in metadata
-                    if not required_skills or not required_knowledge:
-                        extraction_result = extract_job_skills_knowledge(
-                            original_job_desc
-                        )
-                        if not required_skills:
-                            required_skills = extraction_result.get("skills", {})
-                        if not required_knowledge:
-                            required_knowledge = extraction_result.get("knowledge", {})
-
-                except Exception as e:
-                    print(f"OpenAI error for job {job_id}: {e}")
-                    # keep original values if OpenAI fails
-
-            # Build match data
-            match_data = {
-                "user_test_id": str(user_test_id),
-                "job_index": i,  # MUST be 0, 1, 2
-                "job_title": job_title,
-                "job_description": job_desc,
-                "similarity_score": similarity_score,
-                "similarity_percentage": similarity_percentage,
-                "required_skills": required_skills,
-                "required_knowledge": required_knowledge,
-            }
+                job_matches[i].update(await _arun_enrichment_task(jobs[i], task, fields))
+                print(f"Generated OpenAI {task} for job: {job_matches[i]['job_title']}")
+            except Exception as e:
+                # keep metadata values if OpenAI fails
+                print(f"OpenAI error for job {i} ({task}): {e}")
+
+    async def enrich(i: int) -> int:
+        await asyncio.gather(
+            *(run(i, task, fields) for task, fields in jobs[i]["tasks"].items())
+        )
+        return i
+
+    pending = [asyncio.create_task(enrich(i)) for i in range(len(jobs))]
+    try:
+        for next_done in asyncio.as_completed(pending):
+            i = await next_done
+            yield i, job_matches[i]
+    finally:
+        # the consumer may stop early (e.g. client disconnected)
+        for task in pending:
+            task.cancel()
+
 
-            job_matches.append(match_data)
+async def amatch_user_to_job(
+    user_test_id: str,
+    user_embedding: List[float],
+    use_openai_summary: bool = True,
+) -> Dict[str, Any]:
+    """Async version of match_user_to_job, returning matches in rank order"""
+    try:
+        ranked = [
+            item
+            async for item in aiter_job_matches(
+                user_test_id, user_embedding, use_openai_summary
+            )
+        ]
+        if not ranked:
+            print("No similar jobs found in Pinecone")
+            return {"error": "No matching jobs found"}
 
+        job_matches = [job_match for _, job_match in sorted(ranked, key=lambda x: x[0])]
         print(f"Returning {len(job_matches)} job matches")
 
         return {"job_matches": job_matches}
@@ -0,0 +1,127 @@
+"""
+Offline enrichment of the Pinecone job catalog.
+
+Computes summary, required_skills and required_knowledge for every job vector
+and stores them in the job's metadata so that match_user_to_job only has to
+read them. Jobs already enriched with the current JOB_ENRICHMENT_VERSION are
+skipped, so the script can simply be re-run to resume after a failure.
+
+Run from the backend/ folder:
+    python -m services.enrich_jobs_pinecone --workers 4
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.llm_scheduler import PRIORITY_BACKGROUND, llm_priority  # noqa: E402
+from services.embedding_service import (  # noqa: E402
+    JOB_ENRICHMENT_VERSION,
+    enrich_job,
+    pinecone_service,
+)
+
+# =====================================
+# Configurations
+# =====================================
+DEFAULT_MAX_WORKERS = int(os.getenv("ENRICH_MAX_WORKERS", "4"))
+FETCH_BATCH_SIZE = 100  # Pinecone fetch limit per request
+
+
+def needs_enrichment(metadata: dict, force: bool = False) -> bool:
+    """Check whether a job record is missing enrichment for the current version"""
+    if force:
+        return True
+    if metadata.get("enrichment_version") != JOB_ENRICHMENT_VERSION:
+        return True
+    return not metadata.get("summary")
+
+
+def enrich_one(vector_id: str, metadata: dict) -> bool:
+    """Enrich a single job and write the results back to Pinecone"""
+    description = metadata.get("description", "")
+    if not description:
+        print(f"Skipping {vector_id}: no description")
+        return False
+
+    # offline work yields to interactive requests sharing the same budget
+    with llm_priority(PRIORITY_BACKGROUND):
+        result = enrich_job(description)
+
+    # extraction swallows OpenAI errors, so treat an empty result as a failure
+    # and leave the record unmarked so the next run retries it
+    if not result["summary"] or not (
+        result["required_skills"] or result["required_knowledge"]
+    ):
+        print(f"Enrichment incomplete for {vector_id}, will retry on next run")
+        return False
+
+    pinecone_service.update_job_metadata(
+        vector_id,
+        {
+            "summary": result["summary"],
+            "required_skills": json.dumps(result["required_skills"]),
+            "required_knowledge": json.dumps(result["required_knowledge"]),
+            "enrichment_version": JOB_ENRICHMENT_VERSION,
+            "enriched_at": datetime.now(timezone.utc).isoformat(),
+        },
+    )
+    return True
+
+
+def enrich_catalog(max_workers: int = DEFAULT_MAX_WORKERS, force: bool = False):
+    """Enrich every job in the catalog with bounded concurrency"""
+    stats = {"seen": 0, "skipped": 0, "enriched": 0, "failed": 0}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for page in pinecone_service.list_job_ids():
+            for start in range(0, len(page), FETCH_BATCH_SIZE):
+                batch_ids = page[start : start + FETCH_BATCH_SIZE]
+                jobs = pinecone_service.fetch_jobs(batch_ids)
+                stats["seen"] += len(jobs)
+
+                pending = {
+                    vector_id: metadata
+                    for vector_id, metadata in jobs.items()
+                    if needs_enrichment(metadata, force)
+                }
+                stats["skipped"] += len(jobs) - len(pending)
+
+                futures = {
+                    executor.submit(enrich_one, vector_id, metadata): vector_id
+                    for vector_id, metadata in pending.items()
+                }
+                for future in as_completed(futures):
+                    vector_id = futures[future]
+                    try:
+                        if future.result():
+                            stats["enriched"] += 1
+                        else:
+                            stats["failed"] += 1
+                    except Exception as e:
+                        stats["failed"] += 1
+                        print(f"✗ Failed to enrich job {vector_id}: {e}")
+
+                print(
+                    f"Progress: seen={stats['seen']} enriched={stats['enriched']} "
+                    f"skipped={stats['skipped']} failed={stats['failed']}"
+                )
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enrich the Pinecone job catalog")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument(
+        "--force", action="store_true", help="Re-enrich jobs that are already done"
+    )
+    args = parser.parse_args()
+
+    final_stats = enrich_catalog(max_workers=args.workers, force=args.force)
+    print(f"✓ Enrichment finished: {final_stats}")
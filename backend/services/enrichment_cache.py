@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.cache_backends import CACHE_DIR, CacheBackend, SQLiteCacheBackend
+
+
+class EnrichmentCache:
+    """
+    Read-through cache for per-job LLM enrichment (summary, skills, knowledge).
+
+    Keys combine the job id, a hash of the job description and the prompt
+    version, so edited descriptions or changed prompts never reuse stale
+    results. Concurrent misses for the same key are single-flighted: only the
+    first caller computes, the others wait for its result.
+    """
+
+    def __init__(self, backend: CacheBackend, prompt_version: str):
+        self.backend = backend
+        self.prompt_version = prompt_version
+        self._inflight: Dict[str, Future] = {}
+        self._async_inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def make_key(self, job_id: str, description: str, field: str) -> str:
+        description_hash = hashlib.sha256(description.encode()).hexdigest()[:16]
+        return f"{job_id}:{description_hash}:{self.prompt_version}:{field}"
+
+    def get_or_compute(
+        self,
+        job_id: str,
+        description: str,
+        field: str,
+        compute_fn: Callable[[], Any],
+        is_cacheable: Callable[[Any], bool] = bool,
+    ) -> Any:
+        """
+        Return the cached value for (job, description, field) or compute it.
+        Results rejected by is_cacheable (e.g. empty extraction on failure)
+        are returned but not stored.
+        """
+        key = self.make_key(job_id, description, field)
+
+        cached = self._read(key)
+        if cached is not None:
+            self._bump("hits")
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not is_leader:
+            self._bump("coalesced")
+            return future.result()
+
+        try:
+            # a leader that finished after our first read has stored its value
+            cached = self._read(key)
+            if cached is not None:
+                self._bump("hits")
+                future.set_result(cached)
+                return cached
+
+            self._bump("misses")
+            value = compute_fn()
+            if is_cacheable(value):
+                self._write(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            self._bump("errors")
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_compute(
+        self,
+        job_id: str,
+        description: str,
+        field: str,
+        compute_fn: Callable[[], Awaitable[Any]],
+        is_cacheable: Callable[[Any], bool] = bool,
+    ) -> Any:
+        """
+        Async version of get_or_compute for coroutine compute functions.
+        Single-flight is per event loop; backend I/O runs in a worker thread.
+        """
+        key = self.make_key(job_id, description, field)
+
+        cached = await asyncio.to_thread(self._read, key)
+        if cached is not None:
+            self._bump("hits")
+            return cached
+
+        future = self._async_inflight.get(key)
+        if future is not None:
+            self._bump("coalesced")
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_inflight[key] = future
+        try:
+            # a leader that finished after our first read has stored its value
+            cached = await asyncio.to_thread(self._read, key)
+            if cached is not None:
+                self._bump("hits")
+                future.set_result(cached)
+                return cached
+
+            self._bump("misses")
+            value = await compute_fn()
+            if is_cacheable(value):
+                await asyncio.to_thread(self._write, key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self._bump("errors")
+            future.set_exception(e)
+            # mark retrieved so an unawaited failure doesn't log a warning
+            future.exception()
+            raise
+        finally:
+            self._async_inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        # coalesced callers were served without their own LLM call
+        stats["hit_rate"] = (
+            round((stats["hits"] + stats["coalesced"]) / lookups, 4) if lookups else 0.0
+        )
+        stats["entries"] = self.backend.count()
+        return stats
+
+    def _read(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.backend.get(key)
+            return json.loads(raw) if raw is not None else None
+        except Exception as e:
+            print(f"[Enrichment Cache WARNING] Failed to read {key}: {e}")
+            return None
+
+    def _write(self, key: str, value: Any) -> None:
+        # a failed write only costs a later recompute; the value is still good
+        try:
+            self.backend.set(key, json.dumps(value))
+        except Exception as e:
+            print(f"[Enrichment Cache WARNING] Failed to write {key}: {e}")
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+
+def create_enrichment_cache(prompt_version: str) -> EnrichmentCache:
+    """Build the default SQLite-backed enrichment cache"""
+    path = os.getenv(
+        "ENRICHMENT_CACHE_PATH", os.path.join(CACHE_DIR, "job_enrichment.sqlite3")
+    )
+    return EnrichmentCache(
+        backend=SQLiteCacheBackend(path, table="job_enrichment"),
+        prompt_version=prompt_version,
+    )
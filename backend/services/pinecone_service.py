@@ -83,6 +83,32 @@ class PineconeService:
         self.index.upsert(vectors=[vector], namespace="jobs")
         print(f"✓ Job {job_id} upserted to Pinecone")
 
+    def list_job_ids(self):
+        """
+        Yield pages of job vector IDs stored in the jobs namespace
+        """
+        for ids in self.index.list(namespace="jobs"):
+            yield list(ids)
+
+    def fetch_jobs(self, vector_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch job metadata for the given vector IDs, keyed by vector ID
+        """
+        response = self.index.fetch(ids=vector_ids, namespace="jobs")
+        return {
+            vector_id: (vector.metadata or {})
+            for vector_id, vector in response.vectors.items()
+        }
+
+    def update_job_metadata(self, vector_id: str, metadata: Dict[str, Any]) -> None:
+        """
+        Merge extra metadata fields into an existing job vector
+        """
+        clean_metadata = {
+            k: str(v) if v is not None else "" for k, v in metadata.items()
+        }
+        self.index.update(id=vector_id, set_metadata=clean_metadata, namespace="jobs")
+
     def query_similar_jobs(
         self, user_embedding: List[float], top_k: int = 5
     ) -> List[Dict]:
@@ -146,3 +172,41 @@ class PineconeService:
         except Exception as e:
             print(f"✗ Error querying Pinecone for users: {e}")
             return []
+
+    def upsert_questions(self, vectors: List[Dict[str, Any]]) -> None:
+        """
+        Upsert question bank vectors ({"id", "values", "metadata"})
+        """
+        self.index.upsert(vectors=vectors, namespace="questions")
+        print(f"✓ {len(vectors)} questions upserted to Pinecone")
+
+    def query_questions(
+        self, embedding: List[float], top_k: int, filter: Dict[str, Any]
+    ) -> List[Dict]:
+        """
+        Query the question bank by topic embedding with a metadata filter
+        """
+        try:
+            response = self.index.query(
+                vector=embedding,
+                top_k=top_k,
+                include_metadata=True,
+                filter=filter,
+                namespace="questions",
+            )
+            return [
+                {"id": match.id, "score": match.score, "metadata": match.metadata}
+                for match in getattr(response, "matches", [])
+            ]
+
+        except Exception as e:
+            print(f"✗ Error querying Pinecone for questions: {e}")
+            return []
+
+    def count_questions(self) -> int:
+        """
+        Number of questions stored in the question bank
+        """
+        stats = self.index.describe_index_stats()
+        namespace = stats.namespaces.get("questions")
+        return namespace.vector_count if namespace else 0
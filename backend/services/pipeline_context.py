@@ -0,0 +1,117 @@
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from core.database import db
+from models.firestore_models import (
+    get_follow_up_answers_by_user,
+    get_generated_questions,
+    get_latest_attempt_number,
+)
+
+_MISSING = object()
+
+
+class PipelineContext:
+    """
+    Request-scoped cache of the Firestore data one pipeline run needs.
+
+    Every stage of a request (profile embedding, skills analysis, ...) gets
+    the same context, so the user_tests doc, latest attempt, follow-up
+    answers and generated questions are each read once per request.
+    Counters record reads made and reads saved; reusing a memoized derived
+    value (e.g. combined_data) saves every read its build needed.
+    """
+
+    def __init__(self, user_test_id: str, user_test_doc: Any = _MISSING):
+        self.user_test_id = user_test_id
+        self._values: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.reads_saved = 0
+        # reads each derived value's build needed, made or reused
+        self._read_costs: Dict[str, int] = {}
+        # per thread: read counters of the derived builds in progress
+        self._builds = threading.local()
+
+        # the route usually already fetched the user_tests doc
+        if user_test_doc is not _MISSING:
+            self._values["user_test_doc"] = user_test_doc
+
+    def memo(self, name: str, loader: Callable[[], Any], is_read: bool = True) -> Any:
+        """
+        Return the value for name, loading it once per request.
+        Concurrent stages asking for the same value wait for the first load.
+        """
+        with self._lock:
+            key_lock = self._locks.setdefault(name, threading.Lock())
+
+        with key_lock:
+            if name in self._values:
+                cost = 1 if is_read else self._read_costs.get(name, 0)
+                self._count("reads_saved", cost)
+                self._charge(cost)
+                return self._values[name]
+
+            if is_read:
+                value = loader()
+                self._count("reads")
+                self._charge(1)
+            else:
+                builds = self._build_stack()
+                builds.append(0)
+                try:
+                    value = loader()
+                finally:
+                    cost = builds.pop()
+                self._read_costs[name] = cost
+                self._charge(cost)
+            self._values[name] = value
+            return value
+
+    def _build_stack(self) -> list:
+        if not hasattr(self._builds, "stack"):
+            self._builds.stack = []
+        return self._builds.stack
+
+    def _charge(self, reads: int) -> None:
+        """Add reads to the derived builds running in this thread"""
+        builds = self._build_stack()
+        for i in range(len(builds)):
+            builds[i] += reads
+
+    def user_test_doc(self) -> Optional[Dict[str, Any]]:
+        def load():
+            doc = db.collection("user_tests").document(self.user_test_id).get()
+            return doc.to_dict() if doc.exists else None
+
+        return self.memo("user_test_doc", load)
+
+    def latest_attempt(self) -> int:
+        return self.memo(
+            "latest_attempt", lambda: get_latest_attempt_number(self.user_test_id)
+        )
+
+    def follow_ups(self, attempt_number: int) -> list:
+        return self.memo(
+            f"follow_ups:{attempt_number}",
+            lambda: get_follow_up_answers_by_user(self.user_test_id, attempt_number),
+        )
+
+    def generated_questions(self, attempt_number: int) -> list:
+        return self.memo(
+            f"generated_questions:{attempt_number}",
+            lambda: get_generated_questions(self.user_test_id, attempt_number),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "user_test_id": self.user_test_id,
+                "firestore_reads": self.reads,
+                "firestore_reads_saved": self.reads_saved,
+            }
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import core.model_loader as loader
+from services.embedding_service import pinecone_service
+
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "true").lower() == "true"
+# minimum cosine similarity between the user's topics and the topics a banked
+# question was generated for
+QUESTION_BANK_MIN_SCORE = float(os.getenv("QUESTION_BANK_MIN_SCORE", "0.8"))
+# candidates fetched per requested slot, so excluded and already-taken
+# questions can be skipped
+CANDIDATES_PER_SLOT = 3
+# Easy/Medium/Hard mix the generation prompts ask for; bank picks follow it
+DIFFICULTY_RATIOS = {
+    "Coding": {"Easy": 1, "Medium": 1, "Hard": 3},
+    "Non-coding": {"Easy": 1, "Medium": 1, "Hard": 2},
+}
+
+
+def _language_key(language: Optional[str]) -> str:
+    return (language or "").strip().lower()
+
+
+def _difficulty_quotas(category: str, count: int) -> Dict[str, int]:
+    """Questions of each difficulty in count slots, split by DIFFICULTY_RATIOS"""
+    ratios = DIFFICULTY_RATIOS.get(category, DIFFICULTY_RATIOS["Coding"])
+    total = sum(ratios.values())
+    shares = {level: count * weight / total for level, weight in ratios.items()}
+    quotas = {level: int(share) for level, share in shares.items()}
+    # hand out the rounding remainder by largest fractional share
+    by_remainder = sorted(shares, key=lambda level: quotas[level] - shares[level])
+    for level in by_remainder[: count - sum(quotas.values())]:
+        quotas[level] += 1
+    return quotas
+
+
+def _bank_id(question: Dict[str, Any]) -> str:
+    content = f"{question.get('question', '')}\n{question.get('code') or ''}"
+    return hashlib.md5(f"question_{content}".encode()).hexdigest()
+
+
+class QuestionBank:
+    """
+    Validated MCQs stored in Pinecone (namespace "questions"), indexed by the
+    embedding of the topics they were generated for, with category, language
+    and difficulty as metadata.
+
+    Question generation takes as many slots as it can from the bank and only
+    calls the LLM for the gaps; freshly validated MCQs are added back.
+    """
+
+    def __init__(self, enabled: bool = QUESTION_BANK_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = {"added": 0, "errors": 0}
+        # per "category/language": slots requested and slots filled from the bank
+        self._slots: Dict[str, Dict[str, int]] = {}
+
+    def session(
+        self, topics: str, exclude_bank_ids: Optional[Iterable[str]] = None
+    ) -> "QuestionBankSession":
+        """Bank access for one generate_questions run"""
+        return QuestionBankSession(self, topics, exclude_bank_ids)
+
+    def _record_slots(self, category: str, language: str, requested, filled):
+        key = f"{category}/{language}" if language else category
+        with self._lock:
+            slots = self._slots.setdefault(key, {"requested": 0, "filled": 0})
+            slots["requested"] += requested
+            slots["filled"] += filled
+
+    def _bump(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            coverage = {
+                key: {
+                    **slots,
+                    "hit_rate": round(slots["filled"] / slots["requested"], 3),
+                }
+                for key, slots in self._slots.items()
+                if slots["requested"]
+            }
+            stats = dict(self._stats)
+        requested = sum(slots["requested"] for slots in coverage.values())
+        filled = sum(slots["filled"] for slots in coverage.values())
+        try:
+            bank_size = pinecone_service.count_questions() if self.enabled else 0
+        except Exception as e:
+            print(f"[Question Bank] Failed to read bank size: {e}")
+            bank_size = None
+        return {
+            "enabled": self.enabled,
+            "bank_size": bank_size,
+            "slots_requested": requested,
+            "slots_filled": filled,
+            "hit_rate": round(filled / requested, 3) if requested else 0.0,
+            "coverage": coverage,
+            **stats,
+        }
+
+
+class QuestionBankSession:
+    """
+    Topic embedding and exclusions for one run. Questions taken in this run
+    are excluded from later lookups, so two languages never get the same
+    question. Lookup and storage errors only mean more questions are
+    generated.
+    """
+
+    def __init__(
+        self,
+        bank: QuestionBank,
+        topics: str,
+        exclude_bank_ids: Optional[Iterable[str]],
+    ):
+        self.bank = bank
+        self.topics = topics
+        self._exclude = set(exclude_bank_ids or [])
+        self._lock = threading.Lock()
+        self._embedding: Optional[List[float]] = None
+        if bank.enabled and topics:
+            try:
+                self._embedding = loader.get_embeddings(topics)
+            except Exception as e:
+                bank._bump("errors")
+                print(f"[Question Bank] Failed to embed topics: {e}")
+
+    def take(
+        self, category: str, language: Optional[str], count: int
+    ) -> List[Dict[str, Any]]:
+        """Up to count banked MCQs for the category/language, best match first"""
+        if self._embedding is None or count <= 0:
+            return []
+
+        language = _language_key(language)
+        with self._lock:
+            excluded = list(self._exclude)
+        query_filter: Dict[str, Any] = {
+            "category": {"$eq": category},
+            "language": {"$eq": language},
+        }
+        if excluded:
+            query_filter["bank_id"] = {"$nin": excluded}
+
+        matches = pinecone_service.query_questions(
+            self._embedding, count * CANDIDATES_PER_SLOT, query_filter
+        )
+
+        # a slot filled from the bank keeps the prompts' difficulty mix
+        quotas = _difficulty_quotas(category, count)
+        taken = []
+        with self._lock:
+            for match in matches:
+                if len(taken) == count:
+                    break
+                if match["score"] < QUESTION_BANK_MIN_SCORE:
+                    break
+                if match["id"] in self._exclude:
+                    continue
+                difficulty = str(match["metadata"].get("difficulty", "")).capitalize()
+                if not quotas.get(difficulty):
+                    continue
+                try:
+                    question = json.loads(match["metadata"]["mcq"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                quotas[difficulty] -= 1
+                self._exclude.add(match["id"])
+                taken.append({**question, "bank_id": match["id"]})
+
+        self.bank._record_slots(category, language, count, len(taken))
+        print(
+            f"[Question Bank] {category}/{language or '-'}: "
+            f"{len(taken)} of {count} slots filled from the bank"
+        )
+        return taken
+
+    def store(self, questions: List[Dict[str, Any]]) -> None:
+        """Add freshly validated MCQs to the bank and tag them with bank_id"""
+        if self._embedding is None or not questions:
+            return
+
+        created_at = datetime.now(timezone.utc).isoformat()
+        vectors = []
+        for question in questions:
+            question["bank_id"] = _bank_id(question)
+            mcq = {k: v for k, v in question.items() if k != "bank_id"}
+            vectors.append(
+                {
+                    "id": question["bank_id"],
+                    "values": self._embedding,
+                    "metadata": {
+                        "type": "question",
+                        "bank_id": question["bank_id"],
+                        "category": str(question.get("category", "")),
+                        "language": _language_key(question.get("language")),
+                        "difficulty": str(question.get("difficulty", "")),
+                        "topics": self.topics,
+                        "mcq": json.dumps(mcq),
+                        "created_at": created_at,
+                    },
+                }
+            )
+        try:
+            pinecone_service.upsert_questions(vectors)
+            self.bank._bump("added", len(vectors))
+        except Exception as e:
+            self.bank._bump("errors")
+            print(f"[Question Bank] Failed to store questions: {e}")
+
+
+question_bank = QuestionBank()
@@ -1,13 +1,27 @@
 import os
 import json
 import re
+import time
+import hashlib
+import queue
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda, RunnableParallel
 from langchain.schema import SystemMessage, HumanMessage
-from .claude_agent.claude_wrapper import ClaudeWrapper
+from core.circuit_breaker import CircuitOpenError
+from core.json_stream import JSONArrayStreamParser
+from core.llm_cache import (
+    install_langchain_cache,
+    llm_cache_disabled,
+    llm_response_cache,
+)
+from core.llm_metrics import llm_metrics
+from core.llm_gateway import llm_gateway
+from services.question_bank import question_bank
 
 import sys
 
@@ -22,11 +36,30 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY not found. Please set it in your .env file.")
 
+# bump when the topics/languages prompt changes so cached extractions are redone
+TOPIC_EXTRACTION_VERSION = "v1"
+TOTAL_CODING_QUESTIONS = 5
+TOTAL_NON_CODING_QUESTIONS = 5
+# "two_stage": free-form questions first, then a second call converts them
+# "single": each category is generated directly as complete MCQs; compare
+# the two with benchmarks/bench_question_generation.py before switching
+QUESTION_GENERATION_MODE = os.getenv("QUESTION_GENERATION_MODE", "two_stage")
+# max LLM calls in flight for one batch (e.g. one coding prompt per language)
+QUESTION_GENERATION_MAX_CONCURRENCY = int(
+    os.getenv("QUESTION_GENERATION_MAX_CONCURRENCY", "6")
+)
+# streamed questions are validated in chunks of the sidecar's chunk size
+VALIDATION_CHUNK_SIZE = int(os.getenv("CLAUDE_VALIDATION_CHUNK_SIZE", "3"))
+
 # -----------------------------
 # Initialize LLM
 # -----------------------------
-llm = ChatOpenAI(model="gpt-4o", temperature=0.2)
-validator_llm = ClaudeWrapper(endpoint_url="http://localhost:5001/validate", temperature=0.0)
+# share the disk-backed response cache with every LangChain model below
+install_langchain_cache()
+
+# pooled clients, timeouts and accounting come from the shared gateway
+llm = llm_gateway.langchain_chat_model(model="gpt-4o", temperature=0.2)
+validator_llm = llm_gateway.claude_llm("validate", temperature=0.0)
 
 # -----------------------------
 # System Message
@@ -46,19 +79,51 @@ You are an academic question generator for IT topics.
 # -----------------------------
 # JSON Parser
 # -----------------------------
-json_parser = JsonOutputParser()
+def extract_json_from_response(text):
+    """Extract JSON from LLM response that might be wrapped in markdown"""
+    if isinstance(text, (dict, list)):
+        return text
+
+    if isinstance(text, str):
+        # try to parse as pure JSON first
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+
+        # extract JSON from markdown code blocks
+        json_match = re.search(r"```(?:json)?\s*(.*?)\s*```", text, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(1).strip()
+            try:
+                return json.loads(json_str)
+            except json.JSONDecodeError:
+                pass
+
+        # try to find JSON array pattern
+        array_match = re.search(r"(\[.*\])", text, re.DOTALL)
+        if array_match:
+            try:
+                return json.loads(array_match.group(1))
+            except json.JSONDecodeError:
+                pass
+
+    return None
+
+
+json_output = RunnableLambda(extract_json_from_response)
 
 # -----------------------------
 # Prompt Templates
 # -----------------------------
-topics_prompt = PromptTemplate(
+# one call for topics and the programming languages among them
+topics_languages_prompt = PromptTemplate(
     input_variables=["user_input"],
-    template="Extract all coding-related topics, skills, languages, libraries, and frameworks from: '{user_input}'. Output comma-separated list, no explanations.",
-)
-
-languages_prompt = PromptTemplate(
-    input_variables=["topics"],
-    template="From this list: '{topics}', extract all programming languages. Return comma-separated list or 'None' if none.",
+    template="""Extract all coding-related topics, skills, languages, libraries, and frameworks from: '{user_input}'.
+Then identify which of the extracted topics are programming languages.
+Return JSON only, no markdown code blocks, no explanations:
+{{"topics": ["..."], "languages": ["..."]}}
+Use an empty "languages" list if there are none.""",
 )
 
 coding_questions_prompt = PromptTemplate(
@@ -74,12 +139,12 @@ coding_questions_prompt = PromptTemplate(
 )
 
 non_coding_questions_prompt = PromptTemplate(
-    input_variables=["topics"],
-    template="""Generate 5 non-coding conceptual questions based on: '{topics}'.
+    input_variables=["topics", "count"],
+    template="""Generate {count} non-coding conceptual questions based on: '{topics}'.
 - Use formal academic language.
 - Include definitions, theory, practical applications, higher-order thinking.
 - Ensure all topics represented at least once.
-- Difficulty ratio: 1 Easy, 1 Medium, 2 Hard.
+- Difficulty ratio: 1 Easy, 1 Medium, 2 Hard (if {count} >=4; else distribute proportionally).
 - Return as JSON array like:
 [{{"question": "...", "difficulty": "Easy/Medium/Hard", "category": "Non-coding"}}]""",
 )
@@ -116,6 +181,40 @@ Requirements:
 """,
 )
 
+# single-stage prompts: complete MCQs in one call, same structure as the
+# conversion prompts above produce
+coding_mcqs_direct_prompt = PromptTemplate(
+    input_variables=["topics", "lang", "count"],
+    template="""Generate {count} coding MCQs based on: '{topics}' in '{lang}'.
+- Present incomplete code, buggy code, or output prediction questions
+- Question types allowed: output prediction, identify the bug, complete the missing logic (no markdown blocks)
+- Code must not be a complete runnable program. It must contain a bug, missing lines, or a tricky behavior
+- Difficulty ratio: 1 Easy, 1 Medium, 3 Hard (if {count} >=5; else distribute proportionally)
+- Only self-contained examples, no APIs/external files
+- Each question must have 4 equally difficult and plausible options: A, B, C, D
+- Only 1 option correct, indicate with "answer"
+- Options format: ["A. Option text", "B. Option text", "C. Option text", "D. Option text"]
+- Return JSON only, no markdown code blocks, no explanations
+- Structure: [{{"question": "...", "code": "...", "language": "{lang}", "options": ["A...","B...","C...","D..."], "answer":"A", "difficulty":"Easy", "category":"Coding"}}]
+
+IMPORTANT: Output must be valid JSON only, no ```json or any other text:""",
+)
+
+non_coding_mcqs_direct_prompt = PromptTemplate(
+    input_variables=["topics", "count"],
+    template="""Generate {count} non-coding conceptual MCQs based on: '{topics}'.
+- Use formal academic language.
+- Include definitions, theory, practical applications, higher-order thinking.
+- Ensure all topics represented at least once.
+- Difficulty ratio: 1 Easy, 1 Medium, 2 Hard (if {count} >=4; else distribute proportionally).
+- Each question must have 4 equally difficult and plausible options: A, B, C, D
+- Only 1 option correct, indicate with "answer"
+- Options format: ["A. Option text", "B. Option text", "C. Option text", "D. Option text"]
+- Return JSON only, no markdown code blocks, no explanations
+- Structure: [{{"question": "...", "options": ["A...","B...","C...","D..."], "answer":"A", "difficulty":"Easy", "category":"Non-coding"}}]
+""",
+)
+
 # create validation chain prompt
 claude_validation_prompt = PromptTemplate(
     input_variables=["mcqs"],
@@ -133,49 +232,43 @@ Input MCQs: {mcqs}
 # -----------------------------
 # LLM Chains
 # -----------------------------
-topics_chain = LLMChain(llm=llm, prompt=topics_prompt)
-languages_chain = LLMChain(llm=llm, prompt=languages_prompt)
-coding_questions_chain = LLMChain(
-    llm=llm, prompt=coding_questions_prompt, output_parser=json_parser
-)
-non_coding_questions_chain = LLMChain(
-    llm=llm, prompt=non_coding_questions_prompt, output_parser=json_parser
-)
-coding_mcqs_chain = LLMChain(llm=llm, prompt=coding_mcqs_prompt)
-non_coding_mcqs_chain = LLMChain(llm=llm, prompt=non_coding_mcqs_prompt)
-claude_validation_chain = LLMChain(llm=validator_llm, prompt=claude_validation_prompt)
+def _text_chain(prompt, call_site, model=llm):
+    # call_site metadata names each prompt in the LLM metrics
+    return (prompt | model | StrOutputParser()).with_config(
+        run_name=call_site, metadata={"call_site": call_site}
+    )
 
 
-def extract_json_from_response(text):
-    """Extract JSON from LLM response that might be wrapped in markdown"""
-    if isinstance(text, (dict, list)):
-        return text
-
-    if isinstance(text, str):
-        # try to parse as pure JSON first
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            pass
+def _json_chain(prompt, call_site):
+    return (prompt | llm | StrOutputParser() | json_output).with_config(
+        run_name=call_site, metadata={"call_site": call_site}
+    )
 
-        # extract JSON from markdown code blocks
-        json_match = re.search(r"```(?:json)?\s*(.*?)\s*```", text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1).strip()
-            try:
-                return json.loads(json_str)
-            except json.JSONDecodeError:
-                pass
 
-        # try to find JSON array pattern
-        array_match = re.search(r"(\[.*\])", text, re.DOTALL)
-        if array_match:
-            try:
-                return json.loads(array_match.group(1))
-            except json.JSONDecodeError:
-                pass
+topics_languages_chain = _json_chain(topics_languages_prompt, "topics_languages")
+coding_questions_chain = _json_chain(coding_questions_prompt, "coding_questions")
+non_coding_questions_chain = _json_chain(
+    non_coding_questions_prompt, "non_coding_questions"
+)
+coding_mcqs_chain = _json_chain(coding_mcqs_prompt, "coding_mcqs")
+non_coding_mcqs_chain = _json_chain(non_coding_mcqs_prompt, "non_coding_mcqs")
+coding_mcqs_direct_chain = _json_chain(coding_mcqs_direct_prompt, "coding_mcqs_direct")
+non_coding_mcqs_direct_chain = _json_chain(
+    non_coding_mcqs_direct_prompt, "non_coding_mcqs_direct"
+)
+claude_validation_chain = _text_chain(
+    claude_validation_prompt, "claude_validation", model=validator_llm
+)
 
-    return None
+# raw text of the MCQ prompts, for stream_questions to parse as it arrives
+coding_mcqs_stream_chain = _text_chain(coding_mcqs_prompt, "coding_mcqs")
+non_coding_mcqs_stream_chain = _text_chain(non_coding_mcqs_prompt, "non_coding_mcqs")
+coding_mcqs_direct_stream_chain = _text_chain(
+    coding_mcqs_direct_prompt, "coding_mcqs_direct"
+)
+non_coding_mcqs_direct_stream_chain = _text_chain(
+    non_coding_mcqs_direct_prompt, "non_coding_mcqs_direct"
+)
 
 
 def validate_question_structure(questions):
@@ -225,7 +318,7 @@ def run_claude_validation(mcqs, chain):
         print(f"[Claude Agent] Sending {len(mcqs)} MCQs for validation...")
 
         # send properly formatted request
-        response = chain.run({"mcqs": prompt_text})
+        response = chain.invoke({"mcqs": prompt_text})
         validated = extract_json_from_response(response)
 
         if isinstance(validated, list) and validated:
@@ -281,98 +374,426 @@ def run_claude_validation(mcqs, chain):
         print("[Claude Agent WARNING] Validation returned empty or invalid, using original MCQs.")
         return mcqs
     
+    except CircuitOpenError as e:
+        print(f"[Claude Agent] Skipping validation, using original MCQs: {e}")
+        return mcqs
     except Exception as e:
         print("[Claude Agent ERROR] Exception during validation, using original MCQs:", e)
         return mcqs
 
-def generate_questions(skill_reflection: str, thesis_findings: str, career_goals: str):
-    user_input = f"Skill Reflection: {skill_reflection}\nThesis Findings: {thesis_findings}\nCareer Goals: {career_goals}"
 
-    # extract topics
-    topics = topics_chain.run({"user_input": user_input}).strip()
-    print("\n[DEBUG] Extracted topics:", topics)
+def _normalize_input(value) -> str:
+    return " ".join(str(value or "").split()).lower()
+
+
+def _topics_cache_key(skill_reflection, thesis_findings, career_goals) -> str:
+    normalized = json.dumps(
+        [
+            _normalize_input(skill_reflection),
+            _normalize_input(thesis_findings),
+            _normalize_input(career_goals),
+        ]
+    )
+    digest = hashlib.sha256(normalized.encode()).hexdigest()
+    return f"topics_languages:{TOPIC_EXTRACTION_VERSION}:{digest}"
+
+
+def extract_topics_and_languages(skill_reflection, thesis_findings, career_goals):
+    """
+    (comma-separated topics, list of programming languages) for the user's
+    reflection text. Results are cached by a hash of the normalized inputs,
+    so retakes with unchanged text skip the LLM call.
+    """
+    started = time.perf_counter()
+    cache_key = _topics_cache_key(skill_reflection, thesis_findings, career_goals)
+    cached = llm_response_cache.get(cache_key)
+    if cached is not None:
+        llm_metrics.record(
+            "openai",
+            "gpt-4o",
+            time.perf_counter() - started,
+            call_site="topics_languages",
+            cache_hit=True,
+        )
+        extraction = json.loads(cached)
+        return extraction["topics"], extraction["languages"]
 
-    # extract programming languages with filtering
-    all_languages_text = languages_chain.run({"topics": topics}).strip()
-    language_list = []
-    if all_languages_text != "none":
-        language_list = [lang.strip() for lang in all_languages_text.split(",")]
-    print("[DEBUG] Filtered languages list:", language_list)
-
-    # generate coding questions
-    coding_questions = []
-    total_coding_questions = 5
-    if language_list:
-        # merge all languages into one string for prompt
-        langs_str = ", ".join(language_list)
-        try:
-            raw = coding_questions_chain.run(
-                {"topics": topics, "lang": langs_str, "count": total_coding_questions}
-            )
+    user_input = f"Skill Reflection: {skill_reflection}\nThesis Findings: {thesis_findings}\nCareer Goals: {career_goals}"
+    result = topics_languages_chain.invoke({"user_input": user_input})
+    if not isinstance(result, dict):
+        result = {}
 
-            parsed = extract_json_from_response(raw)
-            if isinstance(parsed, list):
-                coding_questions.extend(parsed)
-                print(
-                    f"[SUCCESS] Generated {len(coding_questions)} coding questions for {langs_str}"
-                )
+    topics = ", ".join(
+        str(topic).strip() for topic in result.get("topics") or [] if str(topic).strip()
+    )
+    language_list = []
+    for lang in result.get("languages") or []:
+        lang = str(lang).strip()
+        if lang and lang.lower() != "none" and lang not in language_list:
+            language_list.append(lang)
+
+    if topics:
+        llm_response_cache.set(
+            cache_key, json.dumps({"topics": topics, "languages": language_list})
+        )
+    return topics, language_list
+
+
+def _split_count(total: int, parts: int):
+    """Spread total questions over parts as evenly as possible"""
+    base, extra = divmod(total, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+def _batch_config():
+    return {"max_concurrency": QUESTION_GENERATION_MAX_CONCURRENCY}
+
+
+def _parse_mcqs(raw, label):
+    """Parse an MCQ array from a chain response and keep well-formed items"""
+    mcqs = extract_json_from_response(raw)
+    if not isinstance(mcqs, list):
+        print(f"[ERROR] {label} MCQs are not a list. Type: {type(mcqs)}")
+        return []
+    return validate_question_structure(mcqs)
+
+
+def _coding_mcqs_two_stage(topics, slots):
+    """
+    Coding MCQs for each (language, count) slot: questions for every language
+    in one batch, then one batch converting them to MCQs.
+    """
+    outputs = coding_questions_chain.batch(
+        [{"topics": topics, "lang": lang, "count": count} for lang, count in slots],
+        config=_batch_config(),
+        return_exceptions=True,
+    )
+    results = [[] for _ in slots]
+    generated = []
+    for i, ((lang, _), questions) in enumerate(zip(slots, outputs)):
+        if isinstance(questions, Exception):
+            print(f"[ERROR] Failed coding questions for {lang}:", questions)
+        elif isinstance(questions, list) and questions:
+            print(f"[SUCCESS] Generated {len(questions)} coding questions for {lang}")
+            generated.append((i, questions))
+
+    converted = coding_mcqs_chain.batch(
+        [{"questions": questions} for _, questions in generated],
+        config=_batch_config(),
+        return_exceptions=True,
+    )
+    for (i, _), coding_mcqs in zip(generated, converted):
+        if isinstance(coding_mcqs, Exception):
+            print(f"[ERROR] Failed coding MCQs for {slots[i][0]}:", coding_mcqs)
+        else:
+            results[i] = _parse_mcqs(coding_mcqs, "Coding")
+    return results
+
+
+def _coding_mcqs_single(topics, slots):
+    """Complete coding MCQs for each (language, count) slot in one batch"""
+    outputs = coding_mcqs_direct_chain.batch(
+        [{"topics": topics, "lang": lang, "count": count} for lang, count in slots],
+        config=_batch_config(),
+        return_exceptions=True,
+    )
+    results = []
+    for (lang, _), coding_mcqs in zip(slots, outputs):
+        if isinstance(coding_mcqs, Exception):
+            print(f"[ERROR] Failed coding MCQs for {lang}:", coding_mcqs)
+            results.append([])
+            continue
+        coding_mcqs = _parse_mcqs(coding_mcqs, "Coding")
+        print(f"[SUCCESS] Generated {len(coding_mcqs)} coding MCQs for {lang}")
+        results.append(coding_mcqs)
+    return results
+
+
+def _coding_branch(inputs):
+    """Per-language bank lookup and generation -> Claude validation"""
+    topics, language_list, bank = inputs["topics"], inputs["languages"], inputs["bank"]
+    if not language_list:
+        return []
+
+    slots = [
+        (lang, count)
+        for lang, count in zip(
+            language_list, _split_count(TOTAL_CODING_QUESTIONS, len(language_list))
+        )
+        if count
+    ]
+    # bank lookups and then generation for every language run side by side
+    banked = RunnableLambda(lambda slot: bank.take("Coding", *slot)).batch(
+        slots, config=_batch_config()
+    )
+    gaps = [
+        (lang, count - len(language_banked))
+        for (lang, count), language_banked in zip(slots, banked)
+        if count > len(language_banked)
+    ]
+    if QUESTION_GENERATION_MODE == "single":
+        fresh = _coding_mcqs_single(topics, gaps)
+    else:
+        fresh = _coding_mcqs_two_stage(topics, gaps)
+
+    banked = [q for language_banked in banked for q in language_banked]
+    coding_mcqs = [q for language_fresh in fresh for q in language_fresh]
+
+    # banked questions were validated when they were stored
+    if coding_mcqs:
+        coding_mcqs = run_claude_validation(coding_mcqs, claude_validation_chain)
+        bank.store(coding_mcqs)
+    return banked + coding_mcqs
 
-        except Exception as e:
-            print(f"[ERROR] Failed coding questions for {langs_str}:", e)
 
-    # generate non-coding questions
+def _non_coding_mcqs_two_stage(topics, count):
+    """Generate non-coding questions, then convert them to MCQs"""
     try:
-        non_coding_questions = non_coding_questions_chain.run({"topics": topics})
+        non_coding_questions = non_coding_questions_chain.invoke(
+            {"topics": topics, "count": count}
+        )
         if not isinstance(non_coding_questions, list):
             non_coding_questions = []
     except Exception as e:
         print("[ERROR] Failed non-coding questions:", e)
         non_coding_questions = []
 
-    # convert coding questions to MCQs
-    coding_mcqs = []
-    if coding_questions:
-        try:
-            coding_mcqs_raw = coding_mcqs_chain.run({"questions": coding_questions})
-            coding_mcqs = extract_json_from_response(coding_mcqs_raw)
+    # convert non-coding questions to MCQs
+    if not non_coding_questions:
+        return []
+    try:
+        non_coding_mcqs_raw = non_coding_mcqs_chain.invoke(
+            {"questions": non_coding_questions}
+        )
+        return _parse_mcqs(non_coding_mcqs_raw, "Non-coding")
+    except Exception as e:
+        print("[ERROR] Failed non-coding MCQs:", e)
+        return []
 
-            if not isinstance(coding_mcqs, list):
-                print(f"[ERROR] Coding MCQs are not a list. Type: {type(coding_mcqs)}")
-                coding_mcqs = []
-            else:
-                coding_mcqs = validate_question_structure(coding_mcqs)
 
-        except Exception as e:
-            print("[ERROR] Failed coding MCQs:", e)
-
-    # convert non-coding questions to MCQs
-    non_coding_mcqs = []
-    if non_coding_questions:
-        try:
-            non_coding_mcqs_raw = non_coding_mcqs_chain.run(
-                {"questions": non_coding_questions}
-            )
-            non_coding_mcqs = extract_json_from_response(non_coding_mcqs_raw)
+def _non_coding_mcqs_single(topics, count):
+    """Generate complete non-coding MCQs in one call"""
+    try:
+        raw = non_coding_mcqs_direct_chain.invoke({"topics": topics, "count": count})
+        return _parse_mcqs(raw, "Non-coding")
+    except Exception as e:
+        print("[ERROR] Failed non-coding MCQs:", e)
+        return []
 
-            if not isinstance(non_coding_mcqs, list):
-                non_coding_mcqs = []
-            else:
-                non_coding_mcqs = validate_question_structure(non_coding_mcqs)
 
-        except Exception as e:
-            print("[ERROR] Failed non-coding MCQs:", e)
+def _non_coding_branch(inputs):
+    """Non-coding bank lookup and generation -> Claude validation"""
+    topics, bank = inputs["topics"], inputs["bank"]
+    banked = bank.take("Non-coding", None, TOTAL_NON_CODING_QUESTIONS)
+    gap = TOTAL_NON_CODING_QUESTIONS - len(banked)
+    if not gap:
+        return banked
 
-    # validate coding MCQs
-    if coding_mcqs:
-        coding_mcqs = validate_question_structure(coding_mcqs)
-        coding_mcqs = run_claude_validation(coding_mcqs, claude_validation_chain)
+    if QUESTION_GENERATION_MODE == "single":
+        non_coding_mcqs = _non_coding_mcqs_single(topics, gap)
+    else:
+        non_coding_mcqs = _non_coding_mcqs_two_stage(topics, gap)
 
-    # validate non-coding MCQs
     if non_coding_mcqs:
-        non_coding_mcqs = validate_question_structure(non_coding_mcqs)
-        non_coding_mcqs = run_claude_validation(non_coding_mcqs, claude_validation_chain)
+        non_coding_mcqs = run_claude_validation(
+            non_coding_mcqs, claude_validation_chain
+        )
+        bank.store(non_coding_mcqs)
+    return banked + non_coding_mcqs
+
+
+def _branch_failed(label):
+    def fallback(inputs):
+        print(f"[ERROR] Failed {label} questions:", inputs["error"])
+        return []
+
+    return RunnableLambda(fallback)
+
+
+# the coding and non-coding branches only share the extraction, so they run
+# concurrently; a failed branch contributes no questions
+question_branches = RunnableParallel(
+    coding=RunnableLambda(_coding_branch).with_fallbacks(
+        [_branch_failed("coding")], exception_key="error"
+    ),
+    non_coding=RunnableLambda(_non_coding_branch).with_fallbacks(
+        [_branch_failed("non-coding")], exception_key="error"
+    ),
+)
+
+
+def generate_questions(
+    skill_reflection: str,
+    thesis_findings: str,
+    career_goals: str,
+    exclude_bank_ids=None,
+):
+    """
+    Generate follow-up MCQs, taking as many as possible from the question
+    bank. exclude_bank_ids are bank questions the user has already seen;
+    returned questions that are in the bank carry their bank_id.
+    """
+    started = time.perf_counter()
+
+    # extract topics and programming languages
+    topics, language_list = extract_topics_and_languages(
+        skill_reflection, thesis_findings, career_goals
+    )
+    print("\n[DEBUG] Extracted topics:", topics)
+    print("[DEBUG] Filtered languages list:", language_list)
+    bank = question_bank.session(topics, exclude_bank_ids)
 
-    all_questions = coding_mcqs + non_coding_mcqs
+    # a retake sends the same prompts; a cached response would hand back the
+    # questions (and bank ids) the user was already served
+    with llm_cache_disabled():
+        branches = question_branches.invoke(
+            {"topics": topics, "languages": language_list, "bank": bank}
+        )
+
+    all_questions = branches["coding"] + branches["non_coding"]
     print("[DEBUG] Total questions generated:", len(all_questions))
+    print(f"[Pipeline] generate_questions took {time.perf_counter() - started:.2f}s")
 
     return {"questions": all_questions}
+
+
+# -----------------------------
+# Streaming generation
+# -----------------------------
+def _stream_mcqs(chain, inputs, label):
+    """Well-formed MCQs from a streamed chain response, as each one completes"""
+    parser = JSONArrayStreamParser()
+    for chunk in chain.stream(inputs):
+        yield from validate_question_structure(parser.feed(chunk))
+    print(f"[SUCCESS] Streamed {parser.items} {label} MCQs")
+
+
+def _question_source(topics, category, language, count, bank):
+    """
+    (question, is_fresh) for one category/language slot: banked questions
+    first, then the generated ones as they stream in
+    """
+    banked = bank.take(category, language, count)
+    for question in banked:
+        yield question, False
+    gap = count - len(banked)
+    if not gap:
+        return
+
+    label = f"{category}/{language or '-'}"
+    if category == "Coding":
+        inputs = {"topics": topics, "lang": language, "count": gap}
+        questions_chain = coding_questions_chain
+        convert_chain = coding_mcqs_stream_chain
+        direct_chain = coding_mcqs_direct_stream_chain
+    else:
+        inputs = {"topics": topics, "count": gap}
+        questions_chain = non_coding_questions_chain
+        convert_chain = non_coding_mcqs_stream_chain
+        direct_chain = non_coding_mcqs_direct_stream_chain
+
+    if QUESTION_GENERATION_MODE == "single":
+        fresh = _stream_mcqs(direct_chain, inputs, label)
+    else:
+        # only the conversion streams; it needs every free-form question
+        questions = questions_chain.invoke(inputs)
+        if not isinstance(questions, list) or not questions:
+            return
+        fresh = _stream_mcqs(convert_chain, {"questions": questions}, label)
+    for question in fresh:
+        yield question, True
+
+
+def stream_questions(
+    skill_reflection: str,
+    thesis_findings: str,
+    career_goals: str,
+    exclude_bank_ids=None,
+):
+    """
+    Streaming variant of generate_questions: yields each batch of MCQs as
+    soon as it is ready instead of returning them all at the end. Banked
+    questions come first, one at a time; generated ones are parsed from the
+    streamed LLM output, structure-checked and validated by Claude every
+    VALIDATION_CHUNK_SIZE questions, so the first chunk is sent while the
+    rest are still generating.
+    """
+    started = time.perf_counter()
+
+    topics, language_list = extract_topics_and_languages(
+        skill_reflection, thesis_findings, career_goals
+    )
+    print("\n[DEBUG] Extracted topics:", topics)
+    print("[DEBUG] Filtered languages list:", language_list)
+    bank = question_bank.session(topics, exclude_bank_ids)
+
+    sources = [("Non-coding", None, TOTAL_NON_CODING_QUESTIONS)]
+    if language_list:
+        counts = _split_count(TOTAL_CODING_QUESTIONS, len(language_list))
+        sources += [
+            ("Coding", lang, count) for lang, count in zip(language_list, counts)
+        ]
+
+    ready = queue.Queue()
+    source_done = object()
+    closed = threading.Event()
+    producers = ThreadPoolExecutor(
+        max_workers=len(sources), thread_name_prefix="question-stream"
+    )
+
+    def flush(chunk):
+        validated = run_claude_validation(chunk, claude_validation_chain)
+        bank.store(validated)
+        ready.put(validated)
+
+    def produce(category, language, count):
+        chunk = []
+        try:
+            for question, fresh in _question_source(
+                topics, category, language, count, bank
+            ):
+                if closed.is_set():
+                    break
+                if not fresh:
+                    ready.put([question])
+                    continue
+                chunk.append(question)
+                if len(chunk) == VALIDATION_CHUNK_SIZE:
+                    flush(chunk)
+                    chunk = []
+            if chunk and not closed.is_set():
+                flush(chunk)
+        except Exception as e:
+            print(f"[ERROR] Failed {category} questions for {language or '-'}:", e)
+        ready.put(source_done)
+
+    # fresh questions bypass the response cache, as in generate_questions
+    with llm_cache_disabled():
+        for source in sources:
+            producers.submit(contextvars.copy_context().run, produce, *source)
+
+    remaining, count = len(sources), 0
+    try:
+        while remaining:
+            item = ready.get()
+            if item is source_done:
+                remaining -= 1
+                continue
+            if not item:
+                continue
+            if not count:
+                print(
+                    "[Pipeline] first streamed question after "
+                    f"{time.perf_counter() - started:.2f}s"
+                )
+            count += len(item)
+            yield item
+    finally:
+        # the consumer may stop early (e.g. client disconnected)
+        closed.set()
+        producers.shutdown(wait=False, cancel_futures=True)
+
+    print(
+        f"[Pipeline] stream_questions took {time.perf_counter() - started:.2f}s "
+        f"({count} questions)"
+    )